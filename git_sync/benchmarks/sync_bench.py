@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for sync cycles.
+
+Generates a synthetic repository with a local bare repository as its
+remote, then runs rounds of a scripted edit workload through the file
+watcher, GitHubSyncEngine and the DocumentationManager pipeline. Reports
+per-stage latency, commit throughput, peak memory and the subprocesses
+started, optionally as JSON for regression tracking.
+
+Usage:
+    python git_sync/benchmarks/sync_bench.py [--files N] [--depth D]
+        [--churn F] [--binary-ratio F] [--rounds R]
+        [--workload {edit,mixed,append}] [--no-docs] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import git
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from git_sync.config.sync_config import SyncConfig
+from git_sync.core.documentation_manager import DocumentationManager
+from git_sync.core.metrics_store import MetricsStore
+from git_sync.core.state_store import StateStore
+from git_sync.core.sync_engine import GitHubSyncEngine
+
+TEMPLATES = Path(__file__).resolve().parents[1] / 'templates'
+REPOSITORY = 'bench/synthetic'
+ENGINE_STAGES = ('pull', 'scan', 'compact', 'commit', 'sync', 'push')
+
+class OfflineClient:
+    """GitHub client for a remote that is not on GitHub."""
+
+    validation_ttl = 3600.0
+
+    async def validate_repository(self, repository: str) -> None:
+        pass
+
+    async def get(self, path: str):
+        return 404, None
+
+def generate_repository(root: Path,
+                        files: int,
+                        depth: int,
+                        binary_ratio: float,
+                        rng: random.Random) -> List[str]:
+    """
+    Create a working tree with an initial commit and a bare remote.
+
+    Files are spread over ``depth`` directory levels of ten directories
+    each and mix Python modules, Markdown and text with binary blobs.
+
+    Args:
+        root: Directory receiving ``work`` and ``remote.git``
+        files: Number of files to create
+        depth: Directory levels below the root
+        binary_ratio: Fraction of binary files
+        rng: Random source
+
+    Returns:
+        Repository-relative paths of the generated files
+    """
+    remote = git.Repo.init(root / 'remote.git', bare=True, initial_branch='main')
+    repo = git.Repo.init(root / 'work', initial_branch='main')
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'bench')
+        config.set_value('user', 'email', 'bench@example.com')
+
+    paths = []
+    for i in range(files):
+        directory = '/'.join(f"d{(i // 10 ** level) % 10}" for level in range(depth))
+        if rng.random() < binary_ratio:
+            relative = f"{directory}/blob{i}.bin"
+        else:
+            relative = f"{directory}/{rng.choice(('mod', 'note', 'data'))}{i}"
+            relative += {'mod': '.py', 'note': '.md', 'data': '.txt'}[
+                relative.rpartition('/')[2].rstrip('0123456789')]
+        write_file(root / 'work' / relative, 0, rng)
+        paths.append(relative)
+
+    repo.git.add('--all')
+    repo.index.commit('initial')
+    repo.create_remote('origin', remote.git_dir)
+    repo.git.push('--set-upstream', 'origin', 'main')
+    return paths
+
+def write_file(path: Path, revision: int, rng: random.Random) -> None:
+    """
+    Write synthetic content matching a file's type.
+
+    Args:
+        path: File to write
+        revision: Edit counter included in text content
+        rng: Random source
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.bin':
+        path.write_bytes(rng.randbytes(4096))
+    elif path.suffix == '.py':
+        name = path.stem
+        path.write_text(
+            f'"""Synthetic module {name}, revision {revision}."""\n\n'
+            f'def {name}_value() -> int:\n'
+            f'    """Return the revision."""\n'
+            f'    return {revision}\n'
+        )
+    elif path.suffix == '.md':
+        path.write_text(f"# {path.stem}\n\nRevision {revision}.\n" + "Lorem ipsum.\n" * 20)
+    else:
+        path.write_text(f"revision {revision}\n" + "0123456789abcdef\n" * 40)
+
+def apply_workload(work: Path,
+                   paths: List[str],
+                   workload: str,
+                   churn: float,
+                   revision: int,
+                   rng: random.Random) -> int:
+    """
+    Apply one round of edits to the working tree.
+
+    Args:
+        work: Working tree
+        paths: Existing repository-relative paths, updated in place
+        workload: ``edit`` rewrites files, ``append`` appends a line to text
+            files, ``mixed`` also adds and deletes files
+        churn: Fraction of files touched
+        revision: Round number written into content
+        rng: Random source
+
+    Returns:
+        Number of paths touched
+    """
+    touched = rng.sample(range(len(paths)), max(1, int(len(paths) * churn)))
+    removed = set()
+    for n, index in enumerate(touched):
+        path = work / paths[index]
+        if workload == 'append' and path.suffix != '.bin':
+            with open(path, 'a') as f:
+                f.write(f"appended in round {revision}\n")
+        elif workload == 'mixed' and n % 5 == 0:
+            path.unlink()
+            removed.add(index)
+        elif workload == 'mixed' and n % 5 == 1:
+            relative = f"{Path(paths[index]).parent.as_posix()}/added{revision}_{n}.txt"
+            write_file(work / relative, revision, rng)
+            paths.append(relative)
+        else:
+            write_file(path, revision, rng)
+    paths[:] = [path for index, path in enumerate(paths) if index not in removed]
+    return len(touched)
+
+@contextmanager
+def count_subprocesses() -> Iterator[Counter]:
+    """
+    Count subprocesses started, keyed by command.
+
+    Covers GitPython, plain subprocess and asyncio subprocess calls, which
+    all go through ``subprocess.Popen``.
+
+    Yields:
+        Counter filled while the context is active
+    """
+    counts: Counter = Counter()
+    original = subprocess.Popen.__init__
+
+    def counting_init(self, args, *rest, **kwargs):
+        counts[command_name(args)] += 1
+        original(self, args, *rest, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init
+    try:
+        yield counts
+    finally:
+        subprocess.Popen.__init__ = original
+
+def command_name(args) -> str:
+    """
+    Summarize a command line as program and subcommand.
+
+    Args:
+        args: Command as passed to Popen
+
+    Returns:
+        E.g. ``git diff`` or ``python -m pdoc``
+    """
+    argv = [args] if isinstance(args, (str, bytes, os.PathLike)) else list(args)
+    argv = [os.fsdecode(arg) for arg in argv]
+    program = Path(argv[0]).name if argv else '?'
+    if program.startswith('python') or argv[0] == sys.executable:
+        if len(argv) > 2 and argv[1] == '-m':
+            return f"python -m {argv[2]}"
+        return 'python'
+    rest = iter(argv[1:])
+    for arg in rest:
+        if arg == '-c':
+            next(rest, None)
+        elif not arg.startswith('-'):
+            return f"{program} {arg}"
+    return program
+
+def record_stages(metrics: MetricsStore,
+                  timings: Dict[str, List[float]],
+                  counts: Dict[str, int]) -> None:
+    """
+    Collect the stage durations the engine recorded since the last call.
+
+    Args:
+        metrics: Store the engine records into
+        timings: Durations per stage, extended in place
+        counts: Samples seen per stage, updated in place
+    """
+    for total in metrics.totals():
+        stage = total.name[:-len('_duration_seconds')]
+        if stage in timings and total.name.endswith('_duration_seconds'):
+            # Stages skipped this cycle still report their previous value
+            if total.count > counts.get(stage, 0):
+                timings[stage].append(total.last)
+                counts[stage] = total.count
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples.
+
+    Args:
+        values: Durations in seconds
+
+    Returns:
+        Count, mean, p50, p95 and max
+    """
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'p50': pick(0.5),
+        'p95': pick(0.95),
+        'max': ordered[-1],
+    }
+
+async def run_benchmark(root: Path, args: argparse.Namespace) -> Dict:
+    """
+    Generate the repository and run the workload rounds.
+
+    Args:
+        root: Scratch directory
+        args: Parsed command line
+
+    Returns:
+        Benchmark report
+    """
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    paths = generate_repository(root, args.files, args.depth, args.binary_ratio, rng)
+    generate_seconds = time.perf_counter() - started
+
+    work, logs = root / 'work', root / 'logs'
+    logs.mkdir()
+    # Watcher and doc manager log files are created in the working directory
+    os.chdir(logs)
+    config = SyncConfig(
+        repository=REPOSITORY,
+        branch='main',
+        repository_path=work,
+        github_token='offline',
+        log_path=logs,
+    )
+    state_store = StateStore(logs / 'sync_state.db')
+    metrics = MetricsStore(logs / 'metrics.db')
+
+    tracemalloc.start()
+    with count_subprocesses() as processes:
+        engine = GitHubSyncEngine(config, github_client=OfflineClient(),
+                                  state_store=state_store, metrics=metrics)
+        started = time.perf_counter()
+        await engine.initialize()
+        initialize_seconds = time.perf_counter() - started
+        pipeline = None
+        if not args.no_docs:
+            doc_manager = DocumentationManager(work, TEMPLATES, state_store, REPOSITORY)
+            pipeline = doc_manager.create_pipeline('bench')
+
+        rounds = []
+        engine_timings: Dict[str, List[float]] = {stage: [] for stage in ENGINE_STAGES}
+        stage_counts: Dict[str, int] = {}
+        doc_timings: Dict[str, List[float]] = {}
+        try:
+            for revision in range(1, args.rounds + 1):
+                touched = apply_workload(work, paths, args.workload, args.churn, revision, rng)
+                # Let the watcher deliver the round's events
+                await asyncio.sleep(args.settle)
+
+                before = sum(processes.values())
+                started = time.perf_counter()
+                ok = await engine.sync()
+                await engine.push_queue.flush()
+                cycle = time.perf_counter() - started
+                committed = len(engine.last_changes)
+                record_stages(metrics, engine_timings, stage_counts)
+
+                docs = 0.0
+                failed: List[str] = []
+                if pipeline is not None:
+                    changes = [change for change in engine.last_changes
+                               if not doc_manager.is_generated(change[0])]
+                    # Stages swallow their errors; only the counters show them
+                    failures = {name: stats.failures
+                                for name, stats in pipeline.stats().items()}
+                    started = time.perf_counter()
+                    for stage, duration in (await pipeline.run(changes)).items():
+                        doc_timings.setdefault(stage, []).append(duration)
+                    docs = time.perf_counter() - started
+                    failed = [name for name, stats in pipeline.stats().items()
+                              if stats.failures > failures.get(name, 0)]
+
+                rounds.append({
+                    'round': revision,
+                    'ok': ok and not failed,
+                    'failed_stages': failed,
+                    'touched': touched,
+                    'committed': committed,
+                    'cycle_seconds': cycle,
+                    'docs_seconds': docs,
+                    'subprocesses': sum(processes.values()) - before,
+                })
+        finally:
+            engine.file_watcher.stop_monitoring()
+            await engine.push_queue.close()
+        events = vars(engine.file_watcher.event_stats())
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stages = {stage: summarize(values) for stage, values in engine_timings.items()}
+    for stage, values in doc_timings.items():
+        stages[f"doc_{stage}"] = summarize(values)
+    if pipeline is not None:
+        for name, stats in pipeline.stats().items():
+            stages.setdefault(f"doc_{name}", {'count': 0})['failures'] = stats.failures
+    stages['cycle'] = summarize([r['cycle_seconds'] for r in rounds])
+
+    committed = sum(r['committed'] for r in rounds)
+    cycle_total = sum(r['cycle_seconds'] for r in rounds)
+    return {
+        'config': {key: value for key, value in vars(args).items() if key != 'json'},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'git': git.Git().version(),
+            'cpus': os.cpu_count(),
+        },
+        'generate_seconds': generate_seconds,
+        'initialize_seconds': initialize_seconds,
+        'rounds': rounds,
+        'stages': stages,
+        'throughput_files_per_second': committed / cycle_total if cycle_total else 0.0,
+        'memory': {
+            'python_peak_bytes': python_peak,
+            'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            'children_max_rss_bytes':
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+        },
+        'subprocesses': {
+            'total': sum(processes.values()),
+            'by_command': dict(processes.most_common()),
+        },
+        'watcher_events': events,
+    }
+
+def print_report(report: Dict) -> None:
+    """
+    Print a human-readable summary.
+
+    Args:
+        report: Benchmark report
+    """
+    config = report['config']
+    print(f"repository:   {config['files']} files, depth {config['depth']}, "
+          f"{config['binary_ratio']:.0%} binary, workload {config['workload']} "
+          f"at {config['churn']:.1%} churn")
+    print(f"generate:     {report['generate_seconds']:.2f}s")
+    print(f"initialize:   {report['initialize_seconds']:.2f}s")
+    print(f"{'stage':<22}{'count':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+    for stage, stats in report['stages'].items():
+        if not stats['count']:
+            continue
+        print(f"{stage:<22}{stats['count']:>6}" + ''.join(
+            f"{stats[key] * 1000:>8.1f}ms" for key in ('mean', 'p50', 'p95', 'max')) +
+            (f"  {stats['failures']} failed" if stats.get('failures') else ''))
+    failed_rounds = [r['round'] for r in report['rounds'] if not r['ok']]
+    if failed_rounds:
+        print(f"failed:       rounds {', '.join(map(str, failed_rounds))}")
+    memory = report['memory']
+    print(f"throughput:   {report['throughput_files_per_second']:,.0f} files/s committed")
+    print(f"memory:       {memory['python_peak_bytes'] / 2**20:.1f} MiB Python peak, "
+          f"{memory['max_rss_bytes'] / 2**20:.1f} MiB max RSS, "
+          f"{memory['children_max_rss_bytes'] / 2**20:.1f} MiB largest child")
+    processes = report['subprocesses']
+    print(f"subprocesses: {processes['total']} total, "
+          f"{processes['total'] / max(1, len(report['rounds'])):.1f} per round incl. setup")
+    for command, count in processes['by_command'].items():
+        print(f"  {count:>6}  {command}")
+
+def main() -> None:
+    """Run the benchmark and print or save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--churn', type=float, default=0.02,
+                        help="fraction of files touched per round")
+    parser.add_argument('--binary-ratio', type=float, default=0.1)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--workload', choices=('edit', 'mixed', 'append'), default='mixed')
+    parser.add_argument('--settle', type=float, default=1.0,
+                        help="seconds to wait for watcher events after each edit round")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-docs', action='store_true',
+                        help="skip the documentation pipeline")
+    parser.add_argument('--json', metavar='PATH',
+                        help="write the report as JSON, '-' for stdout")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            report = asyncio.run(run_benchmark(Path(tmp), args))
+        finally:
+            os.chdir(cwd)
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + '\n')
+
+if __name__ == '__main__':
+    main()
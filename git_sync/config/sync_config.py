@@ -8,7 +8,7 @@ and secure credential management for the GitHub sync system.
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import logging
 import os
 import yaml
@@ -31,15 +31,33 @@ class SyncConfig:
     
     # GitHub authentication
     github_token: str
+    github_api_url: str = "https://api.github.com"
     
     # Sync settings
     sync_interval: int = 300  # seconds
     push_retries: int = 3
     auto_commit: bool = True
+
+    # Event-driven sync
+    sync_mode: str = "interval"  # "interval" or "event"
+    quiet_period: float = 5.0  # seconds without changes before syncing
+    max_latency: float = 60.0  # max seconds between first change and sync
     
     # File monitoring
     watch_patterns: list[str] = None
     ignore_patterns: list[str] = None
+    reconcile_interval: int = 3600  # seconds between full working tree scans
+
+    # Advanced settings
+    operation_timeout: float = 30.0  # seconds per git operation
+    concurrent_operations: int = 3  # repositories synced at once
+    cycle_timeout: float = 600.0  # seconds before a sync cycle is abandoned
+    max_file_size: int = 10485760  # bytes, larger files are not committed
+    metrics_port: Optional[int] = None  # local Prometheus exporter port, off if unset
+    telemetry_policies: Optional[List[Dict]] = None  # compaction policies, defaults if unset
+    trace_path: Optional[Path] = None  # Chrome trace file for cycle spans, off if unset
+    slow_cycle_threshold: Optional[float] = None  # seconds; profile slow cycles if set
+    profile_sample_rate: float = 0.0  # fraction of cycles profiled regardless
     
     # Logging
     log_level: int = logging.INFO
@@ -59,6 +77,47 @@ class SyncConfig:
         Raises:
             ValueError: If required environment variables are missing
         """
+        return cls._from_dict(cls._read_config(env))
+
+    @classmethod
+    def all_from_env(cls,
+                     env: Environment = Environment.DEVELOPMENT) -> List['SyncConfig']:
+        """
+        Create one configuration per repository from environment settings.
+
+        An environment may list several repositories under ``repositories``;
+        each entry overrides the environment's settings for that repository.
+        Without that key the environment describes a single repository.
+
+        Args:
+            env: Environment to load configuration for
+
+        Returns:
+            Populated configuration objects
+
+        Raises:
+            ValueError: If required settings are missing for any repository
+        """
+        config = cls._read_config(env)
+        entries = config.pop('repositories', None)
+        if not entries:
+            return [cls._from_dict(config)]
+        return [cls._from_dict({**config, **entry}) for entry in entries]
+
+    @staticmethod
+    def _read_config(env: Environment) -> Dict:
+        """
+        Read the config file and merge in environment-specific settings.
+
+        Args:
+            env: Environment to load configuration for
+
+        Returns:
+            Merged configuration dictionary
+
+        Raises:
+            ValueError: If the config file does not exist
+        """
         config_path = Path(os.getenv('SYNC_CONFIG_PATH', 'config.yml'))
         if not config_path.exists():
             raise ValueError(f"Config file not found: {config_path}")
@@ -69,6 +128,23 @@ class SyncConfig:
         # Load environment-specific settings
         env_config = config.get(env.value, {})
         config.update(env_config)
+        return config
+
+    @classmethod
+    def _from_dict(cls, config: Dict) -> 'SyncConfig':
+        """
+        Build a configuration object from a merged settings dictionary.
+
+        Args:
+            config: Settings for a single repository
+
+        Returns:
+            Populated configuration object
+
+        Raises:
+            ValueError: If required settings are missing
+        """
+        advanced = config.get('advanced', {})
 
         # Validate required settings
         required = {'repository', 'branch', 'repository_path'}
@@ -81,11 +157,25 @@ class SyncConfig:
             branch=config['branch'],
             repository_path=Path(config['repository_path']),
             github_token=cls._load_github_token(),
+            github_api_url=config.get('github_api_url', 'https://api.github.com'),
             sync_interval=config.get('sync_interval', 300),
             push_retries=config.get('push_retries', 3),
             auto_commit=config.get('auto_commit', True),
+            sync_mode=config.get('sync_mode', 'interval'),
+            quiet_period=config.get('quiet_period', 5.0),
+            max_latency=config.get('max_latency', 60.0),
             watch_patterns=config.get('watch_patterns', ['*']),
             ignore_patterns=config.get('ignore_patterns', []),
+            reconcile_interval=config.get('reconcile_interval', 3600),
+            operation_timeout=advanced.get('timeout', 30.0),
+            concurrent_operations=advanced.get('concurrent_operations', 3),
+            cycle_timeout=advanced.get('cycle_timeout', 600.0),
+            max_file_size=advanced.get('max_file_size', 10485760),
+            metrics_port=advanced.get('metrics_port'),
+            telemetry_policies=advanced.get('telemetry_policies'),
+            trace_path=Path(advanced['trace_path']) if advanced.get('trace_path') else None,
+            slow_cycle_threshold=advanced.get('slow_cycle_threshold'),
+            profile_sample_rate=advanced.get('profile_sample_rate', 0.0),
             log_level=cls._parse_log_level(config.get('log_level', 'INFO')),
             log_path=Path(config.get('log_path', 'logs'))
         )
@@ -211,6 +301,21 @@ class ConfigurationManager:
         self.current_config = SyncConfig.from_env(env)
         return self.current_config
 
+    def load_all_configs(self,
+                         env: Environment = Environment.DEVELOPMENT) -> List[SyncConfig]:
+        """
+        Load configurations for every repository in an environment.
+
+        Args:
+            env: Environment to load configuration for
+
+        Returns:
+            Loaded configurations, one per repository
+        """
+        configs = SyncConfig.all_from_env(env)
+        self.current_config = configs[0]
+        return configs
+
     def save_config(self, config: Dict) -> None:
         """
         Save configuration to file.
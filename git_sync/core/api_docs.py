@@ -0,0 +1,368 @@
+"""
+Incremental API documentation builds for the MachinaForge documentation system.
+
+A build cache next to the generated HTML records each module's source hash
+and imports. Only modules whose source changed, and the modules importing
+them, are re-rendered. pdoc runs in subprocesses so imports of the
+documented code neither block nor pollute the sync process.
+"""
+
+import ast
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from html import escape
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import logging
+
+from .ignore_matcher import IgnoreMatcher
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+class ApiDocsBuilder:
+    """Render pdoc API documentation for changed modules only."""
+
+    CACHE_FILE = '.build_cache.json'
+    SKIPPED_PATTERNS = ('.*', '__pycache__/', 'node_modules/')
+
+    def __init__(self,
+                 repo_path: Path,
+                 output_dir: Path,
+                 write_file: Callable[[Path, str], bool],
+                 max_workers: int = 2,
+                 batch_size: int = 50):
+        """
+        Initialize the API docs builder.
+
+        Args:
+            repo_path: Path to the repository root
+            output_dir: Directory receiving the HTML documentation
+            write_file: Function writing a file if its content changed
+            max_workers: Number of pdoc processes run at once
+            batch_size: Largest number of modules rendered per process
+        """
+        self.repo_path = repo_path
+        self.output_dir = output_dir
+        self.write_file = write_file
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def build(self, changes: List[Tuple[str, str]]) -> int:
+        """
+        Bring the API documentation up to date with a change set.
+
+        The first build, when no cache exists yet, renders every module.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+
+        Returns:
+            Number of modules rendered
+        """
+        if importlib.util.find_spec('pdoc') is None:
+            logger.warning("pdoc not installed, skipping API documentation")
+            return 0
+
+        cache = self._load_cache()
+        if cache is None:
+            cache = {}
+            sources = await asyncio.to_thread(self._find_sources)
+        else:
+            sources = [path for path, _ in changes if path.endswith('.py')]
+            if not sources:
+                return 0
+
+        stale, removed = await asyncio.to_thread(self._plan, sources, cache)
+        if not stale and not removed:
+            return 0
+
+        rendered = await self._render(stale)
+        for file_path in rendered:
+            cache[file_path] = stale[file_path]
+        for file_path in removed:
+            self._remove_output(cache.pop(file_path)['module'])
+
+        self._write_index(cache)
+        self.write_file(self.output_dir / self.CACHE_FILE,
+                        json.dumps(cache, indent=1, sort_keys=True))
+        logger.info(
+            f"Rendered API docs for {len(rendered)} of {len(stale)} stale "
+            f"modules, removed {len(removed)}"
+        )
+        return len(rendered)
+
+    def _plan(self,
+              sources: List[str],
+              cache: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Find modules needing a render and modules that were deleted.
+
+        Blocking; hashes and parses the changed sources.
+
+        Args:
+            sources: Repository-relative paths of candidate modules
+            cache: Build cache keyed by repository-relative path
+
+        Returns:
+            Tuple of (new cache entries for stale modules, removed paths)
+        """
+        stale: Dict[str, Dict] = {}
+        removed: List[str] = []
+        for file_path in sources:
+            path = self.repo_path / file_path
+            try:
+                source = path.read_bytes()
+            except (FileNotFoundError, IsADirectoryError):
+                if file_path in cache:
+                    removed.append(file_path)
+                continue
+
+            digest = hashlib.sha256(source).hexdigest()
+            entry = cache.get(file_path)
+            if entry and entry['hash'] == digest:
+                continue
+            module = _module_name(path)
+            stale[file_path] = {
+                'module': module,
+                'hash': digest,
+                'imports': sorted(_imports(source, module))
+            }
+
+        # Importers of a changed module show its members and links, so they
+        # are rendered again from their cached, unchanged source
+        changed = {entry['module'] for entry in stale.values()}
+        changed.update(cache[file_path]['module'] for file_path in removed)
+        for file_path, entry in cache.items():
+            if file_path in stale or file_path in removed:
+                continue
+            if any(_refers_to(name, module)
+                   for name in entry['imports'] for module in changed):
+                stale[file_path] = entry
+        return stale, removed
+
+    async def _render(self, stale: Dict[str, Dict]) -> List[str]:
+        """
+        Render stale modules in concurrent pdoc processes.
+
+        Args:
+            stale: Cache entries of the modules to render
+
+        Returns:
+            Paths of the modules rendered successfully
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        batches = self._batches(stale)
+        results = await asyncio.gather(
+            *(self._render_batch(batch) for batch in batches)
+        )
+        return [file_path for rendered in results for file_path in rendered]
+
+    async def _render_batch(self, batch: List[str]) -> List[str]:
+        """
+        Run pdoc on one batch, retrying modules singly if the batch fails.
+
+        Args:
+            batch: Repository-relative module paths
+
+        Returns:
+            Paths of the modules rendered successfully
+        """
+        async with self._slots:
+            with get_tracer().span('pdoc', 'docs', modules=len(batch)):
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, '-m', 'pdoc', '--no-search',
+                    '-o', str(self.output_dir),
+                    *(str(self.repo_path / file_path) for file_path in batch),
+                    cwd=str(self.repo_path),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+        if process.returncode == 0:
+            return batch
+        if len(batch) == 1:
+            logger.warning(
+                f"pdoc failed for {batch[0]}: {stderr.decode(errors='replace').strip()}"
+            )
+            return []
+
+        # One unimportable module fails the whole batch; isolate it
+        results = await asyncio.gather(
+            *(self._render_batch([file_path]) for file_path in batch)
+        )
+        return [file_path for rendered in results for file_path in rendered]
+
+    def _batches(self, stale: Dict[str, Dict]) -> List[List[str]]:
+        """
+        Split stale modules into batches for pdoc.
+
+        Modules sharing a name cannot be imported by the same process, so
+        each batch holds at most one module of a given name.
+
+        Args:
+            stale: Cache entries of the modules to render
+
+        Returns:
+            Lists of repository-relative module paths
+        """
+        batches: List[List[str]] = []
+        names: List[Set[str]] = []
+        for file_path in sorted(stale):
+            module = stale[file_path]['module']
+            for batch, batch_names in zip(batches, names):
+                if len(batch) < self.batch_size and module not in batch_names:
+                    batch.append(file_path)
+                    batch_names.add(module)
+                    break
+            else:
+                batches.append([file_path])
+                names.append({module})
+        return batches
+
+    def _find_sources(self) -> List[str]:
+        """
+        List every Python module in the repository that git does not ignore.
+
+        Returns:
+            Repository-relative module paths
+        """
+        matcher = IgnoreMatcher.from_repository(self.repo_path, self.SKIPPED_PATTERNS)
+        sources = []
+        for root, dirs, files in os.walk(self.repo_path):
+            relative = Path(root).relative_to(self.repo_path).as_posix()
+            prefix = '' if relative == '.' else relative + '/'
+            dirs[:] = [d for d in dirs
+                       if not matcher.is_ignored(prefix + d, is_dir=True)]
+            for name in files:
+                if name.endswith('.py') and not matcher.is_ignored(prefix + name):
+                    sources.append(prefix + name)
+        return sources
+
+    def _load_cache(self) -> Optional[Dict[str, Dict]]:
+        """
+        Load the build cache.
+
+        Returns:
+            Cache keyed by repository-relative path, or None if there is no
+            usable cache
+        """
+        try:
+            return json.loads((self.output_dir / self.CACHE_FILE).read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning("API docs build cache is corrupt, rebuilding")
+            return None
+
+    def _remove_output(self, module: str) -> None:
+        """
+        Delete the documentation of a removed module.
+
+        Args:
+            module: Dotted module name
+        """
+        path = self.output_dir / (module.replace('.', '/') + '.html')
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _write_index(self, cache: Dict[str, Dict]) -> None:
+        """
+        Write an index page linking every documented module.
+
+        Args:
+            cache: Build cache keyed by repository-relative path
+        """
+        modules = sorted(entry['module'] for entry in cache.values())
+        links = "\n".join(
+            f'<li><a href="{escape(module.replace(".", "/"))}.html">'
+            f'{escape(module)}</a></li>'
+            for module in modules
+        )
+        self.write_file(
+            self.output_dir / 'index.html',
+            "<!doctype html>\n<html><head><meta charset=\"utf-8\">"
+            "<title>API Documentation</title></head>\n"
+            f"<body>\n<h1>API Documentation</h1>\n<ul>\n{links}\n</ul>\n"
+            "</body></html>\n"
+        )
+
+def _module_name(path: Path) -> str:
+    """
+    Get the dotted module name pdoc documents a file under.
+
+    Args:
+        path: Absolute path of a Python file
+
+    Returns:
+        Module name, qualified by enclosing packages
+    """
+    parts = [] if path.name == '__init__.py' else [path.stem]
+    parent = path.parent
+    while (parent / '__init__.py').exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    return '.'.join(parts)
+
+def _imports(source: bytes, module: str) -> Set[str]:
+    """
+    Collect the modules a source file imports.
+
+    Relative imports are resolved against the file's own package.
+
+    Args:
+        source: Python source
+        module: Dotted name of the importing module
+
+    Returns:
+        Imported module names
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package = module.split('.')[:-1]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = package[:len(package) - node.level + 1] if node.level else []
+            if node.module:
+                base = base + node.module.split('.')
+            if base:
+                names.add('.'.join(base))
+                # "from package import module" imports submodules too
+                names.update('.'.join(base + [alias.name]) for alias in node.names)
+    return names
+
+def _refers_to(imported: str, module: str) -> bool:
+    """
+    Check whether an import names a module.
+
+    Matching is loose on the leading packages, because files outside a
+    package are documented under their bare name but imported through
+    whatever directory is on the path.
+
+    Args:
+        imported: Name used in an import statement
+        module: Dotted module name
+
+    Returns:
+        True if the import refers to the module or one of its submodules
+    """
+    return (imported == module or
+            imported.startswith(module + '.') or
+            imported.endswith('.' + module))
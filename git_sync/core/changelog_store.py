@@ -0,0 +1,237 @@
+"""
+Append-only changelog storage for the MachinaForge documentation system.
+
+Changelog entries are appended to one JSON Lines file per version instead of
+rewriting CHANGELOG.md. The Markdown file is rendered only after new entries
+arrive and shows just the most recent page of entries, read from the end of
+the logs, so an update costs O(page) rather than O(history).
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChangelogStore:
+    """Structured, deduplicated changelog with paged Markdown rendering."""
+
+    LEGACY_FILE = 'CHANGELOG.legacy.md'
+    MARKER = '<!-- Generated from docs/changelog; edit entries there -->'
+
+    def __init__(self, store_dir: Path, page_size: int = 200):
+        """
+        Initialize the changelog store.
+
+        Args:
+            store_dir: Directory holding one ``<version>.jsonl`` per version
+            page_size: Number of most recent entries shown in CHANGELOG.md
+        """
+        self.store_dir = store_dir
+        self.page_size = page_size
+        self._seen: Dict[str, Set[Tuple[str, str]]] = {}
+
+    def append(self,
+               version: str,
+               records: List[Tuple[str, str, str]]) -> int:
+        """
+        Append entries for a version, skipping ones already recorded.
+
+        Args:
+            version: Version the changes belong to
+            records: List of (file_path, change_type, description) tuples
+
+        Returns:
+            Number of entries actually appended
+        """
+        seen = self._load_seen(version)
+        date = datetime.now().strftime('%Y-%m-%d')
+        lines = []
+        for file_path, change_type, description in records:
+            key = (file_path, change_type)
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(json.dumps({
+                'date': date,
+                'file': file_path,
+                'change_type': change_type,
+                'description': description
+            }) + '\n')
+
+        if lines:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._version_path(version), 'a') as f:
+                f.writelines(lines)
+        return len(lines)
+
+    def render(self, changelog_path: Path) -> str:
+        """
+        Render the most recent page of entries as Markdown.
+
+        A hand-written CHANGELOG.md found on first use is archived next to
+        the logs and linked, so no history is lost.
+
+        Args:
+            changelog_path: Location of CHANGELOG.md, used for linking
+
+        Returns:
+            CHANGELOG.md content
+        """
+        self._archive_legacy(changelog_path)
+
+        sections: List[str] = ["# Changelog\n", self.MARKER + "\n"]
+        remaining = self.page_size
+        truncated = False
+        for version, path in self._versions_newest_first():
+            if remaining <= 0:
+                truncated = True
+                break
+            current_date = None
+            # One extra entry tells whether this page is the last one
+            for entry in self._tail_entries(path, remaining + 1):
+                if remaining <= 0:
+                    truncated = True
+                    break
+                if entry['date'] != current_date:
+                    current_date = entry['date']
+                    sections.append(f"\n## [{version}] - {current_date}\n\n")
+                sections.append(f"* {entry['description']}\n")
+                remaining -= 1
+
+        relative_store = os.path.relpath(self.store_dir, changelog_path.parent)
+        if truncated:
+            sections.append(
+                f"\nOlder entries are kept in `{relative_store}/`.\n"
+            )
+        legacy = self.store_dir / self.LEGACY_FILE
+        if legacy.exists():
+            sections.append(
+                f"\nEarlier history: [{self.LEGACY_FILE}]"
+                f"({relative_store}/{self.LEGACY_FILE})\n"
+            )
+        return ''.join(sections)
+
+    def _load_seen(self, version: str) -> Set[Tuple[str, str]]:
+        """
+        Load the (file, change_type) pairs already recorded for a version.
+
+        The log is read once per process; later appends update the set.
+
+        Args:
+            version: Version to load
+
+        Returns:
+            Mutable set of recorded pairs
+        """
+        if version not in self._seen:
+            seen = set()
+            path = self._version_path(version)
+            if path.exists():
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        seen.add((entry['file'], entry['change_type']))
+            self._seen[version] = seen
+        return self._seen[version]
+
+    def _version_path(self, version: str) -> Path:
+        """
+        Get the log file for a version.
+
+        Args:
+            version: Version name
+
+        Returns:
+            Path of the version's JSON Lines file
+        """
+        safe = re.sub(r'[^\w.\-]', '_', version)
+        return self.store_dir / f"{safe}.jsonl"
+
+    def _versions_newest_first(self) -> List[Tuple[str, Path]]:
+        """
+        List versions by most recent activity.
+
+        Returns:
+            List of (version, path) tuples
+        """
+        if not self.store_dir.exists():
+            return []
+        paths = sorted(self.store_dir.glob('*.jsonl'),
+                       key=lambda p: p.stat().st_mtime,
+                       reverse=True)
+        return [(path.stem, path) for path in paths]
+
+    def _tail_entries(self, path: Path, limit: int) -> Iterator[Dict]:
+        """
+        Read up to ``limit`` entries from the end of a log, newest first.
+
+        Args:
+            path: Version log file
+            limit: Maximum number of entries
+
+        Yields:
+            Decoded entries
+        """
+        count = 0
+        for line in _reverse_lines(path):
+            if count >= limit:
+                return
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            count += 1
+            yield entry
+
+    def _archive_legacy(self, changelog_path: Path) -> None:
+        """
+        Move a changelog not produced by this store out of the way once.
+
+        Args:
+            changelog_path: Location of CHANGELOG.md
+        """
+        legacy = self.store_dir / self.LEGACY_FILE
+        if legacy.exists() or not changelog_path.exists():
+            return
+        content = changelog_path.read_text()
+        if self.MARKER in content:
+            return
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        legacy.write_text(content)
+        logger.info(f"Archived existing changelog to {legacy}")
+
+def _reverse_lines(path: Path, block_size: int = 65536) -> Iterator[str]:
+    """
+    Iterate over a file's lines from last to first.
+
+    Args:
+        path: File to read
+        block_size: Bytes read per step
+
+    Yields:
+        Non-empty lines without line endings
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step) + remainder
+            lines = block.split(b'\n')
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode()
+        if remainder.strip():
+            yield remainder.decode()
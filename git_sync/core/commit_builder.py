@@ -0,0 +1,192 @@
+"""
+Commit construction for the MachinaForge sync engine.
+
+This module turns a list of analyzed changes into a single commit. Additions
+and removals are grouped, large change sets are streamed in chunks to one
+``git update-index`` process so the index is written once per commit, and
+oversized files are rejected from their size on disk without being read.
+The staged result can be checked for sensitive data before it is committed;
+flagged files are unstaged and held back while the rest is committed.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import logging
+import os
+import subprocess
+
+import git
+
+from .secret_scanner import SecretScanner
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CommitPlan:
+    """Paths grouped by how they are staged."""
+
+    additions: List[str] = field(default_factory=list)
+    removals: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)  # over the size limit
+    size: int = 0  # bytes of the additions
+
+    def __bool__(self) -> bool:
+        return bool(self.additions or self.removals)
+
+@dataclass
+class CommitResult:
+    """Outcome of committing a change set."""
+
+    commit: Optional[git.Commit] = None  # None if nothing was committed
+    held: List[str] = field(default_factory=list)  # flagged by the scanner
+
+class CommitBuilder:
+    """Stage and commit analyzed changes in one index write."""
+
+    def __init__(self,
+                 repo: git.Repo,
+                 max_file_size: int = 10485760,
+                 chunk_size: int = 500,
+                 scanner: Optional[SecretScanner] = None):
+        """
+        Initialize the commit builder.
+
+        Args:
+            repo: Repository to commit to
+            max_file_size: Largest file size in bytes allowed in a commit
+            chunk_size: Number of paths written to git per chunk
+            scanner: Checks staged changes for sensitive data before
+                committing, or None to commit unchecked
+        """
+        self.repo = repo
+        self.max_file_size = max_file_size
+        self.chunk_size = chunk_size
+        self.scanner = scanner
+
+    def plan(self, changes: List[Tuple[str, str]]) -> CommitPlan:
+        """
+        Group changes into additions, removals and oversized files.
+
+        Paths are classified by what is on disk now rather than by their
+        reported change type, so a file deleted and recreated since the
+        analysis is staged correctly.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+
+        Returns:
+            Commit plan for the changes
+        """
+        root = Path(self.repo.working_tree_dir)
+        plan = CommitPlan()
+        for file_path, _ in changes:
+            try:
+                size = os.lstat(root / file_path).st_size
+            except FileNotFoundError:
+                # Deleted, or the old side of a rename
+                plan.removals.append(file_path)
+                continue
+            if size > self.max_file_size:
+                logger.warning(
+                    f"Not committing {file_path}: {size} bytes exceeds "
+                    f"limit of {self.max_file_size}"
+                )
+                plan.skipped.append(file_path)
+            else:
+                plan.additions.append(file_path)
+                plan.size += size
+        return plan
+
+    def commit(self,
+               changes: List[Tuple[str, str]],
+               message: str) -> CommitResult:
+        """
+        Stage changes and create a commit.
+
+        Blocking; run it through the git executor.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+            message: Commit message
+
+        Returns:
+            The new commit, if anything was stageable and not flagged, and
+            the paths the scanner held back
+        """
+        plan = self.plan(changes)
+        if not plan:
+            return CommitResult()
+        with get_tracer().span('stage_and_commit', 'git',
+                               additions=len(plan.additions),
+                               removals=len(plan.removals),
+                               bytes=plan.size):
+            return self._commit_plan(plan, message)
+
+    def _commit_plan(self, plan: CommitPlan, message: str) -> CommitResult:
+        """
+        Stage a non-empty plan and commit what the scanner accepts.
+
+        Args:
+            plan: Paths to stage
+            message: Commit message
+
+        Returns:
+            The new commit and the paths held back
+        """
+        # A single update-index process stages additions and removals
+        # from a streamed path list and writes the index once
+        process = self.repo.git.update_index(
+            '--add', '--remove', '-z', '--stdin',
+            as_process=True,
+            istream=subprocess.PIPE
+        )
+        try:
+            for chunk in self._chunks(plan.removals + plan.additions):
+                process.stdin.write(
+                    b''.join(os.fsencode(path) + b'\0' for path in chunk)
+                )
+        finally:
+            process.stdin.close()
+            process.wait()
+
+        result = CommitResult()
+        if self.scanner is not None:
+            # index.commit() bypasses the pre-commit hook, so run its check here
+            with get_tracer().span('secret_scan', 'git') as span:
+                findings = self.scanner.scan_staged()
+                span.set(findings=len(findings))
+            if findings:
+                for finding in findings:
+                    logger.error(f"Potential sensitive data: {finding}")
+                result.held = sorted({finding.path for finding in findings})
+                # Unstage only the flagged files; the rest of the index,
+                # including anything staged by hand, is kept
+                for chunk in self._chunks(result.held):
+                    self.repo.git.reset('--quiet', '--', *chunk)
+                held = set(result.held)
+                plan.additions = [path for path in plan.additions if path not in held]
+                plan.removals = [path for path in plan.removals if path not in held]
+                if not plan:
+                    return result
+
+        result.commit = self.repo.index.commit(message)
+        logger.info(
+            f"Committed {len(plan.additions)} additions and "
+            f"{len(plan.removals)} removals"
+        )
+        return result
+
+    def _chunks(self, paths: List[str]) -> Iterator[List[str]]:
+        """
+        Split paths into chunks for staging.
+
+        Args:
+            paths: Paths to split
+
+        Yields:
+            Lists of at most chunk_size paths
+        """
+        for start in range(0, len(paths), self.chunk_size):
+            yield paths[start:start + self.chunk_size]
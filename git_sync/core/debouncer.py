@@ -0,0 +1,198 @@
+"""
+Event debouncing for the MachinaForge file watcher.
+
+This module coalesces bursts of file system events per path. The first event
+of a burst is delivered immediately and the last one is delivered once the
+path has been quiet for the debounce window, so no final write is lost.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DebounceStats:
+    """Counters describing debouncer activity."""
+
+    received: int = 0   # events submitted
+    delivered: int = 0  # events passed on to the callback
+    coalesced: int = 0  # events superseded by a later event for the same key
+    evicted: int = 0    # bursts flushed early because the table was full
+    dropped: int = 0    # events rejected by filtering before debouncing
+    pending: int = 0    # keys currently inside their debounce window
+
+class _Entry:
+    """Debounce state for one key."""
+
+    __slots__ = ('last_seen', 'pending')
+
+    def __init__(self, last_seen: float):
+        self.last_seen = last_seen
+        self.pending: Optional[Any] = None
+
+class Debouncer:
+    """Leading- and trailing-edge debouncer with bounded, expiring state."""
+
+    def __init__(self,
+                 deliver: Callable[[Any], None],
+                 window: float = 1.0,
+                 max_entries: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the debouncer.
+
+        Args:
+            deliver: Function called with each event that survives debouncing
+            window: Quiet period in seconds that ends a burst
+            max_entries: Maximum number of keys tracked at once; the oldest
+                burst is flushed early when the limit is exceeded
+            clock: Monotonic time source in seconds
+        """
+        self.deliver = deliver
+        self.window = window
+        self.max_entries = max_entries
+        self._clock = clock
+        # Ordered by last activity, so the oldest entry always expires first
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._cond = threading.Condition()
+        self._stats = DebounceStats()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Start the background thread delivering trailing events."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name='debouncer', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and deliver all pending events."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def submit(self, key: str, event: Any) -> None:
+        """
+        Submit an event for debouncing.
+
+        Args:
+            key: Identity used to group events, usually the file path
+            event: Event to deliver
+        """
+        with self._cond:
+            now = self._clock()
+            self._stats.received += 1
+            due = self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                if not self._entries:
+                    self._cond.notify()
+                self._entries[key] = _Entry(now)
+                due.append(event)
+                due.extend(self._evict())
+            else:
+                if entry.pending is not None:
+                    self._stats.coalesced += 1
+                entry.pending = event
+                entry.last_seen = now
+                self._entries.move_to_end(key)
+        self._deliver(due)
+
+    def flush(self) -> None:
+        """Deliver every pending trailing event immediately."""
+        with self._cond:
+            due = [entry.pending for entry in self._entries.values()
+                   if entry.pending is not None]
+            self._entries.clear()
+        self._deliver(due)
+
+    def stats(self) -> DebounceStats:
+        """
+        Get a snapshot of the debouncer counters.
+
+        Returns:
+            Copy of the current counters
+        """
+        with self._cond:
+            return replace(self._stats, pending=len(self._entries))
+
+    def _expire(self, now: float) -> List[Any]:
+        """
+        Remove entries whose window has passed.
+
+        Args:
+            now: Current clock value
+
+        Returns:
+            Trailing events that are now due
+        """
+        due = []
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if now - entry.last_seen < self.window:
+                break
+            self._entries.popitem(last=False)
+            if entry.pending is not None:
+                due.append(entry.pending)
+        return due
+
+    def _evict(self) -> List[Any]:
+        """
+        Drop the oldest entries while over capacity.
+
+        Returns:
+            Trailing events flushed early by the eviction
+        """
+        due = []
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            self._stats.evicted += 1
+            if entry.pending is not None:
+                due.append(entry.pending)
+        return due
+
+    def _deliver(self, events: List[Any]) -> None:
+        """
+        Pass events to the callback outside the lock.
+
+        Args:
+            events: Events to deliver
+        """
+        for event in events:
+            try:
+                self.deliver(event)
+            except Exception as e:
+                logger.error(f"Error delivering debounced event: {e}")
+        if events:
+            with self._cond:
+                self._stats.delivered += len(events)
+
+    def _run(self) -> None:
+        """Wait for the oldest window to close and deliver due events."""
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                timeout = None
+                if self._entries:
+                    oldest = next(iter(self._entries.values()))
+                    timeout = max(
+                        0.0, oldest.last_seen + self.window - self._clock()
+                    )
+                self._cond.wait(timeout)
+                due = self._expire(self._clock())
+            self._deliver(due)
@@ -0,0 +1,299 @@
+"""
+File dependency graph for the MachinaForge file watcher.
+
+Edges come from Python imports (parsed with ``ast``) and from relative
+Markdown links in the documentation trees. A file's outgoing edges are
+re-parsed only when it changes, a reverse index maps each file to the files
+depending on it, and transitive dependents are cached until the graph
+changes, so finding everything affected by a change costs O(affected).
+
+All paths are repository-relative and use forward slashes.
+"""
+
+import ast
+import itertools
+import os
+import posixpath
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DependencyGraph:
+    """Incrementally maintained graph of which files depend on which."""
+
+    MARKDOWN_ROOTS = ('docs/', 'Agents/', 'Tasks/')
+    MARKDOWN_LINK = re.compile(r'\[[^\]]*\]\(\s*<?([^)\s>#?]+)')
+
+    def __init__(self, root: Path):
+        """
+        Initialize an empty dependency graph.
+
+        Args:
+            root: Repository root the paths are relative to
+        """
+        self.root = root
+        self._lock = threading.RLock()
+        # file -> files it depends on, from parsing and from add_edge
+        self._parsed: Dict[str, Set[str]] = {}
+        self._manual: Dict[str, Set[str]] = {}
+        # file -> files depending on it
+        self._reverse: Dict[str, Set[str]] = {}
+        self._closures: Dict[str, FrozenSet[str]] = {}
+        # file -> sequence number of the parse its edges come from; the
+        # startup index and change events parse files concurrently
+        self._sequence = itertools.count(1)
+        self._parse_sequence: Dict[str, int] = {}
+
+    def tracks(self, path: str) -> bool:
+        """
+        Check whether a file type carries dependency information.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            True for Python files and Markdown under the documentation trees
+        """
+        return path.endswith('.py') or (
+            path.endswith('.md') and path.startswith(self.MARKDOWN_ROOTS)
+        )
+
+    def build(self, paths: Iterable[str]) -> None:
+        """
+        Index a set of files, e.g. the whole tree at startup.
+
+        Args:
+            paths: Repository-relative paths; untracked types are skipped
+        """
+        count = 0
+        for path in paths:
+            if self.tracks(path):
+                self.update(path)
+                count += 1
+        logger.info(f"Indexed dependencies of {count} files")
+
+    def update(self, path: str) -> None:
+        """
+        Re-parse one file and replace its outgoing edges.
+
+        A file that no longer exists loses its outgoing edges; edges
+        pointing at it are kept so a re-created file is linked again. The
+        file is parsed outside the lock, and the result is dropped if a
+        parse that started later was already applied.
+
+        Args:
+            path: Repository-relative path of the changed file
+        """
+        if not self.tracks(path):
+            return
+        with self._lock:
+            sequence = next(self._sequence)
+        try:
+            source = (self.root / path).read_bytes()
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            targets: Set[str] = set()
+        else:
+            if path.endswith('.py'):
+                targets = self._python_dependencies(path, source)
+            else:
+                targets = self._markdown_dependencies(path, source)
+        targets.discard(path)
+
+        with self._lock:
+            if sequence < self._parse_sequence.get(path, 0):
+                return
+            self._parse_sequence[path] = sequence
+            previous = self._parsed.get(path, set())
+            if targets == previous:
+                return
+            for target in previous - targets:
+                if target not in self._manual.get(path, ()):
+                    self._reverse_remove(target, path)
+            for target in targets - previous:
+                self._reverse.setdefault(target, set()).add(path)
+            if targets:
+                self._parsed[path] = targets
+            else:
+                self._parsed.pop(path, None)
+            self._closures.clear()
+
+    def add_edge(self, source: str, dependent: str) -> None:
+        """
+        Declare a dependency that parsing cannot discover.
+
+        Args:
+            source: File depended on
+            dependent: File depending on ``source``
+        """
+        with self._lock:
+            self._manual.setdefault(dependent, set()).add(source)
+            self._reverse.setdefault(source, set()).add(dependent)
+            self._closures.clear()
+
+    def dependencies(self, path: str) -> Set[str]:
+        """
+        Get the files a file depends on directly.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            Direct dependencies
+        """
+        with self._lock:
+            return self._parsed.get(path, set()) | self._manual.get(path, set())
+
+    def dependents(self, path: str) -> Set[str]:
+        """
+        Get the files depending on a file directly.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            Direct dependents
+        """
+        with self._lock:
+            return set(self._reverse.get(path, ()))
+
+    def affected(self, path: str) -> FrozenSet[str]:
+        """
+        Get every file depending on a file, directly or transitively.
+
+        Args:
+            path: Repository-relative path of the changed file
+
+        Returns:
+            Transitive dependents, excluding the file itself
+        """
+        with self._lock:
+            cached = self._closures.get(path)
+            if cached is not None:
+                return cached
+
+            seen: Set[str] = set()
+            queue = deque([path])
+            while queue:
+                for dependent in self._reverse.get(queue.popleft(), ()):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        queue.append(dependent)
+            seen.discard(path)
+            closure = frozenset(seen)
+            self._closures[path] = closure
+            return closure
+
+    def _reverse_remove(self, target: str, dependent: str) -> None:
+        """
+        Remove one edge from the reverse index.
+
+        Args:
+            target: File depended on
+            dependent: File no longer depending on it
+        """
+        dependents = self._reverse.get(target)
+        if dependents is None:
+            return
+        dependents.discard(dependent)
+        if not dependents:
+            del self._reverse[target]
+
+    def _python_dependencies(self, path: str, source: bytes) -> Set[str]:
+        """
+        Resolve the imports of a Python file to repository files.
+
+        Absolute imports are looked up from the importing file's directory
+        and each of its parents, since scripts here are run from several
+        places rather than installed as packages.
+
+        Args:
+            path: Repository-relative path of the file
+            source: File contents
+
+        Returns:
+            Imported files inside the repository
+        """
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            logger.debug(f"Cannot parse {path} for imports")
+            return set()
+
+        directory = posixpath.dirname(path)
+        bases = []
+        current = directory
+        while True:
+            bases.append(current)
+            if not current:
+                break
+            current = posixpath.dirname(current)
+
+        targets = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    targets.update(self._resolve_module(alias.name, bases))
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = directory
+                    for _ in range(node.level - 1):
+                        base = posixpath.dirname(base)
+                    search = [base]
+                else:
+                    search = bases
+                module = node.module or ''
+                for alias in node.names:
+                    # "from package import name" may name a submodule
+                    submodule = f"{module}.{alias.name}" if module else alias.name
+                    found = self._resolve_module(submodule, search)
+                    if not found and module:
+                        found = self._resolve_module(module, search)
+                    targets.update(found)
+        return targets
+
+    def _resolve_module(self, module: str, bases: List[str]) -> Set[str]:
+        """
+        Find the file defining a dotted module name.
+
+        Args:
+            module: Dotted module name
+            bases: Directories to search, nearest first
+
+        Returns:
+            The module's file, or an empty set if it is not in the repository
+        """
+        relative = module.replace('.', '/')
+        for base in bases:
+            candidate = posixpath.join(base, relative) if base else relative
+            for path in (candidate + '.py', candidate + '/__init__.py'):
+                if os.path.isfile(self.root / path):
+                    return {path}
+        return set()
+
+    def _markdown_dependencies(self, path: str, source: bytes) -> Set[str]:
+        """
+        Resolve the relative links of a Markdown file to repository files.
+
+        Args:
+            path: Repository-relative path of the file
+            source: File contents
+
+        Returns:
+            Linked files inside the repository
+        """
+        directory = posixpath.dirname(path)
+        targets = set()
+        for match in self.MARKDOWN_LINK.finditer(source.decode(errors='replace')):
+            link = match.group(1)
+            if ':' in link or link.startswith('/'):
+                continue  # URL, mailto: or site-absolute link
+            target = posixpath.normpath(posixpath.join(directory, link))
+            if target.startswith('..') or not os.path.exists(self.root / target):
+                continue
+            targets.add(target)
+        return targets
@@ -0,0 +1,122 @@
+"""
+Documentation generation pipeline for the MachinaForge documentation system.
+
+Each generator is a stage declaring which changed paths it depends on.
+Stages whose inputs are untouched are skipped, the rest run concurrently,
+blocking stages in a worker thread, and every stage is timed.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+import time
+
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+Changes = List[Tuple[str, str]]
+
+@dataclass
+class DocStage:
+    """A documentation generator and the changes it depends on."""
+
+    name: str
+    run: Callable[[Changes], Optional[Awaitable[None]]]
+    accepts: Callable[[str], bool] = lambda path: True
+    blocking: bool = False  # run is synchronous and goes to a worker thread
+
+@dataclass
+class StageStats:
+    """Timing and outcome counters for one stage."""
+
+    runs: int = 0
+    skips: int = 0
+    failures: int = 0
+    last_duration: float = 0.0
+    total_duration: float = 0.0
+
+class DocPipeline:
+    """Run documentation stages concurrently, skipping untouched ones."""
+
+    def __init__(self, stages: List[DocStage]):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages to run for each change set
+        """
+        self.stages = stages
+        self._stats: Dict[str, StageStats] = {
+            stage.name: StageStats() for stage in stages
+        }
+
+    async def run(self, changes: Changes) -> Dict[str, float]:
+        """
+        Run every stage with relevant changes.
+
+        A failing stage is logged and does not stop the others.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+
+        Returns:
+            Duration in seconds of each stage that ran
+        """
+        scheduled = []
+        for stage in self.stages:
+            relevant = [change for change in changes if stage.accepts(change[0])]
+            if relevant:
+                scheduled.append((stage, relevant))
+            else:
+                self._stats[stage.name].skips += 1
+
+        durations = await asyncio.gather(
+            *(self._run_stage(stage, relevant) for stage, relevant in scheduled)
+        )
+        timings = {stage.name: duration
+                   for (stage, _), duration in zip(scheduled, durations)}
+        if timings:
+            logger.info("Documentation stages: " + ", ".join(
+                f"{name} {duration * 1000:.0f}ms" for name, duration in timings.items()
+            ))
+        return timings
+
+    def stats(self) -> Dict[str, StageStats]:
+        """
+        Get a snapshot of per-stage counters.
+
+        Returns:
+            Stage statistics keyed by stage name
+        """
+        return {name: StageStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    async def _run_stage(self, stage: DocStage, changes: Changes) -> float:
+        """
+        Run and time one stage.
+
+        Args:
+            stage: Stage to run
+            changes: Changes relevant to the stage
+
+        Returns:
+            Duration in seconds
+        """
+        stats = self._stats[stage.name]
+        start = time.perf_counter()
+        with get_tracer().span(stage.name, 'docs', files=len(changes)) as span:
+            try:
+                if stage.blocking:
+                    await asyncio.to_thread(stage.run, changes)
+                else:
+                    await stage.run(changes)
+                stats.runs += 1
+            except Exception as e:
+                stats.failures += 1
+                span.set(error=str(e))
+                logger.error(f"Documentation stage {stage.name} failed: {e}")
+        duration = time.perf_counter() - start
+        stats.last_duration = duration
+        stats.total_duration += duration
+        return duration
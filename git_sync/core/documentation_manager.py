@@ -5,150 +5,300 @@ This module handles automatic documentation generation, README management,
 and intelligent content preservation for the project's documentation.
 """
 
+import hashlib
+import json
+import os
 import re
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 import logging
 import yaml
-from jinja2 import Environment, FileSystemLoader
+
+from .api_docs import ApiDocsBuilder
+from .changelog_store import ChangelogStore
+from .doc_pipeline import DocPipeline, DocStage
+from .manual_sections import extract_manual_sections, restore_manual_sections
+from .state_store import StateStore
+from .template_registry import get_registry
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
+# Footer of generated documents; its date alone never warrants a rewrite
+GENERATED_DATE_LINE = re.compile(rb'^Generated by MachinaForge on .*$', re.MULTILINE)
+
 class DocumentationManager:
     """Manage project documentation and README files."""
 
-    def __init__(self, repo_path: Path, template_path: Path):
+    # Files written by this manager, relative to the repository root
+    GENERATED_FILES = ('README.md', 'CHANGELOG.md', 'CONTRIBUTING.md')
+    GENERATED_DIRS = ('docs/api/', 'docs/changelog/')
+
+    # Context keys that change on every render and must not force one
+    VOLATILE_CONTEXT_KEYS = ('generated_date',)
+
+    def __init__(self,
+                 repo_path: Path,
+                 template_path: Path,
+                 state_store: Optional[StateStore] = None,
+                 repository: str = ''):
         """
         Initialize the documentation manager.
 
         Args:
             repo_path: Path to the repository root
             template_path: Path to documentation templates
+            state_store: Store keeping render fingerprints across restarts
+            repository: Repository name the fingerprints are stored under
         """
         self.repo_path = repo_path
         self.template_path = template_path
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(template_path)),
-            trim_blocks=True,
-            lstrip_blocks=True
+        self.templates = get_registry(template_path)
+        self.changelog_store = ChangelogStore(repo_path / 'docs' / 'changelog')
+        self.api_docs = ApiDocsBuilder(
+            repo_path, repo_path / 'docs' / 'api', self._write_if_changed
+        )
+        self.state_store = state_store
+        self.repository = repository
+        # Fingerprint of the inputs behind each generated file's last render
+        self._render_hashes: Dict[str, str] = (
+            state_store.load_documents(repository) if state_store else {}
         )
-        self.preserved_sections: Dict[str, str] = {}
         self._setup_logging()
 
     async def update_readme(self, changes: List[Tuple[str, str]]) -> None:
         """
         Update README with latest changes while preserving manual content.
 
+        Rendering is skipped when the template, the render context and the
+        README on disk are unchanged since the last update, and the file is
+        only rewritten when the rendered bytes differ.
+
         Args:
             changes: List of recent changes to document
         """
         readme_path = self.repo_path / 'README.md'
-        if readme_path.exists():
-            self._preserve_manual_sections(readme_path)
-
-        template = self.jinja_env.get_template('README.md.j2')
+        template = self.templates.get_template('README.md.j2')
         context = await self._generate_readme_context(changes)
-        
-        content = template.render(**context)
-        content = self._restore_manual_sections(content)
-        
-        readme_path.write_text(content)
-        logger.info("Updated README.md")
 
-    async def generate_api_docs(self) -> None:
-        """Generate API documentation from source code."""
-        try:
-            import pdoc
-            
-            output_dir = self.repo_path / 'docs' / 'api'
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Generate API documentation
-            pdoc.pdoc(
-                str(self.repo_path),
-                output_directory=str(output_dir)
-            )
-            logger.info("Generated API documentation")
-
-        except ImportError:
-            logger.warning("pdoc not installed, skipping API documentation")
+        fingerprint = self._fingerprint(template.filename, context, readme_path)
+        if fingerprint == self._render_hashes.get('README.md'):
+            logger.debug("README.md inputs unchanged, skipping render")
             return
 
+        content = restore_manual_sections(
+            template.render(**context),
+            extract_manual_sections(readme_path)
+        )
+
+        if self._write_if_changed(readme_path, content):
+            logger.info("Updated README.md")
+        self._record_render('README.md', self._fingerprint(
+            template.filename, context, readme_path
+        ))
+
+    def create_pipeline(self, version: str) -> DocPipeline:
+        """
+        Build the pipeline running every generator of this manager.
+
+        Args:
+            version: Version changelog entries are recorded under
+
+        Returns:
+            Pipeline with one stage per generated document
+        """
+        contributing_template = os.path.relpath(
+            self.template_path / 'CONTRIBUTING.md.j2', self.repo_path
+        )
+        return DocPipeline([
+            DocStage('readme', self.update_readme),
+            DocStage('changelog',
+                     lambda changes: self.update_changelog(version, changes)),
+            # The contributor guide depends on its template only, but must
+            # be rendered once before changes to it can be detected
+            DocStage('contributing',
+                     lambda changes: self.generate_contributor_docs(),
+                     accepts=lambda path: (
+                         path == contributing_template or
+                         'CONTRIBUTING.md' not in self._render_hashes
+                     ),
+                     blocking=True),
+            DocStage('api_docs', self.generate_api_docs,
+                     accepts=lambda path: path.endswith('.py')),
+        ])
+
+    def is_generated(self, file_path: str) -> bool:
+        """
+        Check whether a repository path is output of this manager.
+
+        Documenting these paths would make every doc update trigger another.
+
+        Args:
+            file_path: Repository-relative path to check
+
+        Returns:
+            True if the path is generated documentation
+        """
+        return (file_path in self.GENERATED_FILES or
+                file_path.startswith(self.GENERATED_DIRS))
+
+    async def generate_api_docs(self, changes: List[Tuple[str, str]]) -> None:
+        """
+        Generate API documentation for changed Python modules.
+
+        Args:
+            changes: List of changes since the last update
+        """
+        await self.api_docs.build(changes)
+
     async def update_changelog(self, 
                              version: str,
                              changes: List[Tuple[str, str]]) -> None:
         """
         Update the project changelog.
 
+        Entries are appended to the changelog store; CHANGELOG.md is only
+        re-rendered when an entry not yet recorded for the version arrives.
+
         Args:
             version: Version number for the changes
             changes: List of changes to document
         """
         changelog_path = self.repo_path / 'CHANGELOG.md'
-        
-        # Generate change entries
-        entries = await self._generate_changelog_entries(changes)
-        
-        # Update changelog file
-        if changelog_path.exists():
-            content = changelog_path.read_text()
-        else:
-            content = "# Changelog\n\n"
-
-        # Add new version section
-        new_section = f"\n## [{version}] - {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        new_section += "\n".join(entries)
-        
-        content = new_section + "\n" + content
-        changelog_path.write_text(content)
-        logger.info(f"Updated changelog for version {version}")
+
+        records = await self._generate_changelog_entries(changes)
+        if not self.changelog_store.append(version, records):
+            logger.debug(f"No new changelog entries for version {version}")
+            return
+
+        content = self.changelog_store.render(changelog_path)
+        if self._write_if_changed(changelog_path, content):
+            logger.info(f"Updated changelog for version {version}")
 
     def generate_contributor_docs(self) -> None:
         """Generate contributor documentation and guidelines."""
-        template = self.jinja_env.get_template('CONTRIBUTING.md.j2')
+        template = self.templates.get_template('CONTRIBUTING.md.j2')
         context = self._generate_contributor_context()
         
         output_path = self.repo_path / 'CONTRIBUTING.md'
-        output_path.write_text(template.render(**context))
-        logger.info("Generated contributor documentation")
+        fingerprint = self._fingerprint(template.filename, context, output_path)
+        if fingerprint == self._render_hashes.get('CONTRIBUTING.md'):
+            return
 
-    def _preserve_manual_sections(self, file_path: Path) -> None:
+        if self._write_if_changed(output_path, template.render(**context)):
+            logger.info("Generated contributor documentation")
+        self._record_render('CONTRIBUTING.md', self._fingerprint(
+            template.filename, context, output_path
+        ))
+
+    def _fingerprint(self,
+                     template_file: Optional[str],
+                     context: Dict,
+                     output_path: Path) -> str:
         """
-        Preserve manually written documentation sections.
+        Hash everything a rendered document depends on.
+
+        The output file's size and mtime are included so manual edits to
+        the generated file are noticed without reading it.
 
         Args:
-            file_path: Path to the file to analyze
+            template_file: Path of the template source
+            context: Template render context
+            output_path: Generated file
+
+        Returns:
+            Hex digest identifying the render inputs
         """
-        content = file_path.read_text()
-        manual_sections = re.finditer(
-            r'<!-- MANUAL_SECTION_START:(\w+) -->\n(.*?)\n<!-- MANUAL_SECTION_END -->',
-            content,
-            re.DOTALL
+        stable = {key: value for key, value in context.items()
+                  if key not in self.VOLATILE_CONTEXT_KEYS}
+        digest = hashlib.sha256(
+            json.dumps(stable, sort_keys=True, default=str).encode()
         )
-        
-        for match in manual_sections:
-            section_name = match.group(1)
-            section_content = match.group(2)
-            self.preserved_sections[section_name] = section_content.strip()
+        for path in (template_file, output_path):
+            try:
+                stat = os.stat(path) if path else None
+            except FileNotFoundError:
+                stat = None
+            if stat:
+                digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+            else:
+                digest.update(b"missing")
+        return digest.hexdigest()
+
+    def _record_render(self, document: str, fingerprint: str) -> None:
+        """
+        Remember the inputs of a document's last render.
+
+        Args:
+            document: Generated file name
+            fingerprint: Fingerprint of the render inputs
+        """
+        if self._render_hashes.get(document) == fingerprint:
+            return
+        self._render_hashes[document] = fingerprint
+        if self.state_store:
+            self.state_store.save_document(self.repository, document, fingerprint)
+
+    def _write_if_changed(self, path: Path, content: str) -> bool:
+        """
+        Atomically replace a file unless it already holds the content.
+
+        The new content is written to a hidden temporary file next to the
+        target and renamed over it, so readers never see a partial file.
+        Content differing only in the generated-on date of its footer
+        counts as unchanged.
+
+        Args:
+            path: File to write
+            content: New file content
 
-    def _restore_manual_sections(self, content: str) -> str:
+        Returns:
+            True if the file was written
+        """
+        data = content.encode()
+        with get_tracer().span('write', 'docs', path=path.name, bytes=len(data)) as span:
+            written = self._replace_file(path, data)
+            span.set(written=written)
+        return written
+
+    def _replace_file(self, path: Path, data: bytes) -> bool:
         """
-        Restore preserved manual sections to the content.
+        Write a file through a temporary file unless it holds the data.
 
         Args:
-            content: Content to restore sections to
+            path: File to write
+            data: New file content
 
         Returns:
-            Content with manual sections restored
+            True if the file was written
         """
-        for section_name, section_content in self.preserved_sections.items():
-            placeholder = f"<!-- MANUAL_SECTION:{section_name} -->"
-            replacement = f"""<!-- MANUAL_SECTION_START:{section_name} -->
-{section_content}
-<!-- MANUAL_SECTION_END -->"""
-            content = content.replace(placeholder, replacement)
-        return content
+        try:
+            existing = path.read_bytes()
+            if (existing == data or GENERATED_DATE_LINE.sub(b'', existing) ==
+                    GENERATED_DATE_LINE.sub(b'', data)):
+                return False
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return True
 
     async def _generate_readme_context(self, 
                                      changes: List[Tuple[str, str]]) -> Dict:
@@ -172,21 +322,22 @@ class DocumentationManager:
         }
 
     async def _generate_changelog_entries(self, 
-                                       changes: List[Tuple[str, str]]) -> List[str]:
+                                       changes: List[Tuple[str, str]]
+                                       ) -> List[Tuple[str, str, str]]:
         """
-        Generate formatted changelog entries.
+        Generate changelog entries.
 
         Args:
             changes: Changes to document
 
         Returns:
-            List of formatted changelog entries
+            List of (file_path, change_type, description) tuples
         """
         entries = []
         for file_path, change_type in changes:
             # Analyze change and generate meaningful entry
             description = await self._analyze_change(file_path, change_type)
-            entries.append(f"* {description}")
+            entries.append((file_path, change_type, description))
         return entries
 
     async def _analyze_change(self, 
@@ -216,7 +367,8 @@ class DocumentationManager:
             'project_name': self.repo_path.name,
             'setup_steps': self._extract_setup_steps(),
             'coding_standards': self._extract_coding_standards(),
-            'commit_guidelines': self._get_commit_guidelines()
+            'commit_guidelines': self._get_commit_guidelines(),
+            'generated_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
     async def _extract_project_description(self) -> str:
@@ -320,7 +472,12 @@ manager.start()
 
     def _setup_logging(self) -> None:
         """Configure logging for the documentation manager."""
-        handler = logging.FileHandler('documentation_manager.log')
+        # Managers for several repositories share one log file
+        log_file = os.path.abspath('documentation_manager.log')
+        if any(getattr(h, 'baseFilename', None) == log_file
+               for h in logger.handlers):
+            return
+        handler = logging.FileHandler(log_file)
         handler.setFormatter(
             logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
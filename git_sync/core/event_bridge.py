@@ -0,0 +1,202 @@
+"""
+Thread-to-asyncio hand-off for file system events.
+
+This module moves events from the watchdog observer thread into the asyncio
+event loop. Events published between two loop iterations are coalesced per
+path and delivered as one batch, and a slow consumer causes queued batches to
+be replaced by a single rescan marker instead of growing without bound.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List
+import logging
+import threading
+import time
+
+from watchdog.events import FileSystemEvent
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class EventBatch:
+    """Events coalesced during one event loop tick."""
+
+    events: List[FileSystemEvent] = field(default_factory=list)
+    # Events were discarded under backpressure; consumers must rescan
+    rescan: bool = False
+    created_at: float = field(default_factory=time.monotonic)
+
+@dataclass
+class BridgeStats:
+    """Counters and gauges describing the event bridge."""
+
+    published: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    dropped_events: int = 0
+    rescans: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    latency_p50: float = 0.0
+    latency_p95: float = 0.0
+    latency_max: float = 0.0
+
+class EventBridge:
+    """Deliver watcher events into an asyncio loop in bounded batches."""
+
+    def __init__(self,
+                 loop: asyncio.AbstractEventLoop,
+                 max_batches: int = 100,
+                 max_batch_size: int = 1000):
+        """
+        Initialize the event bridge.
+
+        Args:
+            loop: Event loop that consumes the batches
+            max_batches: Queue capacity in batches before backpressure
+            max_batch_size: Maximum number of events per batch
+        """
+        self._loop = loop
+        self.max_batches = max_batches
+        self.max_batch_size = max_batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_batches)
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, FileSystemEvent] = {}
+        self._buffer_overflowed = False
+        self._flush_scheduled = False
+        self._rescan_queued = False
+        self._latencies: Deque[float] = deque(maxlen=1024)
+        self._stats = BridgeStats()
+
+    def publish(self, event: FileSystemEvent) -> None:
+        """
+        Publish an event from any thread.
+
+        Args:
+            event: The file system event to hand off
+        """
+        with self._lock:
+            self._stats.published += 1
+            if event.src_path in self._buffer:
+                self._stats.coalesced += 1
+            self._buffer[event.src_path] = event
+
+            # The loop itself may be stalled, so bound the buffer as well
+            if len(self._buffer) > self.max_batches * self.max_batch_size:
+                self._stats.dropped_events += len(self._buffer)
+                self._buffer.clear()
+                self._buffer_overflowed = True
+
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        try:
+            self._loop.call_soon_threadsafe(self._flush)
+        except RuntimeError:
+            logger.debug("Event loop closed, discarding file events")
+
+    async def get(self) -> EventBatch:
+        """
+        Wait for the next batch of events.
+
+        Returns:
+            The oldest queued batch
+        """
+        batch = await self._queue.get()
+        self._taken(batch)
+        return batch
+
+    def drain(self) -> List[EventBatch]:
+        """
+        Take all queued batches without waiting.
+
+        Returns:
+            Queued batches, oldest first
+        """
+        batches = []
+        while not self._queue.empty():
+            batch = self._queue.get_nowait()
+            self._taken(batch)
+            batches.append(batch)
+        return batches
+
+    def stats(self) -> BridgeStats:
+        """
+        Get a snapshot of bridge metrics.
+
+        Returns:
+            Counters, current and maximum queue depth, and hand-off
+            latency percentiles in seconds
+        """
+        with self._lock:
+            stats = BridgeStats(**vars(self._stats))
+        stats.depth = self._queue.qsize()
+        latencies = sorted(self._latencies)
+        if latencies:
+            stats.latency_p50 = latencies[len(latencies) // 2]
+            stats.latency_p95 = latencies[int(len(latencies) * 0.95)]
+            stats.latency_max = latencies[-1]
+        return stats
+
+    def _flush(self) -> None:
+        """Move buffered events into the queue as batches (loop thread)."""
+        with self._lock:
+            events = list(self._buffer.values())
+            overflowed = self._buffer_overflowed
+            self._buffer = {}
+            self._buffer_overflowed = False
+            self._flush_scheduled = False
+
+        if overflowed and not self._rescan_queued:
+            self._put_rescan()
+        for start in range(0, len(events), self.max_batch_size):
+            self._put(EventBatch(events[start:start + self.max_batch_size]))
+
+    def _put(self, batch: EventBatch) -> None:
+        """
+        Queue a batch, falling back to a rescan marker when full.
+
+        Args:
+            batch: Batch to queue
+        """
+        try:
+            self._queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            with self._lock:
+                self._stats.dropped_events += len(batch.events)
+            # A queued rescan already covers anything dropped after it
+            if not self._rescan_queued:
+                self._put_rescan()
+            return
+
+        with self._lock:
+            self._stats.batches += 1
+            self._stats.max_depth = max(self._stats.max_depth,
+                                        self._queue.qsize())
+
+    def _put_rescan(self) -> None:
+        """Replace everything queued with a single rescan marker."""
+        dropped = 0
+        while not self._queue.empty():
+            dropped += len(self._queue.get_nowait().events)
+        self._queue.put_nowait(EventBatch(rescan=True))
+        self._rescan_queued = True
+
+        with self._lock:
+            self._stats.dropped_events += dropped
+            self._stats.rescans += 1
+        logger.warning("Event consumer too slow, falling back to a rescan")
+
+    def _taken(self, batch: EventBatch) -> None:
+        """
+        Update bookkeeping for a batch leaving the queue.
+
+        Args:
+            batch: Batch taken from the queue
+        """
+        if batch.rescan:
+            self._rescan_queued = False
+        self._latencies.append(time.monotonic() - batch.created_at)
@@ -6,30 +6,47 @@ filtering and dependency tracking capabilities.
 """
 
 import asyncio
-from datetime import datetime
+import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Callable
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Callable, Tuple
 import logging
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
+from .debouncer import DebounceStats, Debouncer
+from .dependency_graph import DependencyGraph
+from .ignore_matcher import IgnoreMatcher
+from .tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
 class FileChangeHandler(FileSystemEventHandler):
     """Handle file system events with intelligent filtering."""
 
+    READ_ONLY_EVENTS = frozenset({'opened', 'closed_no_write'})
+
     def __init__(self, callback: Callable[[FileSystemEvent], None],
-                 ignore_patterns: Set[str]):
+                 matcher: IgnoreMatcher,
+                 root: Path,
+                 debounce_window: float = 1.0,
+                 max_tracked_paths: int = 10000):
         """
         Initialize the file change handler.
 
         Args:
             callback: Function to call when valid changes are detected
-            ignore_patterns: Set of glob patterns to ignore
+            matcher: Compiled ignore rules for repository-relative paths
+            root: Repository root that event paths are relative to
+            debounce_window: Seconds a path must be quiet to end a burst
+            max_tracked_paths: Maximum number of paths held for debouncing
         """
         self.callback = callback
-        self.ignore_patterns = ignore_patterns
-        self._last_events: Dict[str, datetime] = {}
+        self.matcher = matcher
+        self.root = root
+        self._root_prefix = os.path.join(str(root), '')
+        self.debouncer = Debouncer(callback, debounce_window, max_tracked_paths)
+        self.dropped = 0
 
     def on_any_event(self, event: FileSystemEvent) -> None:
         """
@@ -39,8 +56,9 @@ class FileChangeHandler(FileSystemEventHandler):
             event: The file system event to process
         """
         if self._should_process_event(event):
-            self._last_events[event.src_path] = datetime.now()
-            self.callback(event)
+            self.debouncer.submit(event.src_path, event)
+        else:
+            self.dropped += 1
 
     def _should_process_event(self, event: FileSystemEvent) -> bool:
         """
@@ -52,96 +70,285 @@ class FileChangeHandler(FileSystemEventHandler):
         Returns:
             bool: True if the event should be processed
         """
-        # Ignore temporary files and specific patterns
-        path = Path(event.src_path)
-        
-        # Check against ignore patterns
-        if any(path.match(pattern) for pattern in self.ignore_patterns):
+        # Opening or reading a file is not a change
+        if event.event_type in self.READ_ONLY_EVENTS:
             return False
 
-        # Ignore temporary files
-        if path.name.startswith('.') or path.name.endswith('~'):
+        # Editors often save by renaming a hidden temporary file into
+        # place, so a move counts if either end is accepted
+        dest_path = getattr(event, 'dest_path', '')
+        if not (self._accepts(event.src_path, event.is_directory) or
+                (dest_path and self._accepts(dest_path, event.is_directory))):
             return False
 
-        # Implement debouncing
-        last_event_time = self._last_events.get(event.src_path)
-        if last_event_time:
-            time_diff = (datetime.now() - last_event_time).total_seconds()
-            if time_diff < 1.0:  # Debounce threshold
+        return True
+
+    def _accepts(self, raw_path: str, is_dir: bool) -> bool:
+        """
+        Check a single event path against the ignore rules.
+
+        Args:
+            raw_path: Path as reported by watchdog
+            is_dir: Whether the path is a directory
+
+        Returns:
+            bool: True if the path is neither ignored nor temporary
+        """
+        if raw_path.startswith(self._root_prefix):
+            relative = raw_path[len(self._root_prefix):]
+        else:
+            relative = os.path.relpath(raw_path, self.root)
+            if relative.startswith('..'):
                 return False
+        if os.sep != '/':
+            relative = relative.replace(os.sep, '/')
 
-        return True
+        # Ignore temporary files
+        name = relative.rpartition('/')[2]
+        if name.startswith('.') or name.endswith('~'):
+            return False
+
+        return not self.matcher.is_ignored(relative, is_dir)
 
 class FileWatcher:
     """Monitor file system changes with intelligent filtering and dependency tracking."""
 
-    def __init__(self, path: Path):
+    DEFAULT_IGNORE_PATTERNS = (
+        "*.pyc",
+        "*.pyo",
+        "*.pyd",
+        "*.so",
+        "*.dylib",
+        "*.dll",
+        "__pycache__",
+        ".git",
+        ".idea",
+        ".vscode",
+        "*.swp",
+        "*.swo",
+        "node_modules",
+        "venv",
+        ".env"
+    )
+
+    def __init__(self,
+                 path: Path,
+                 ignore_patterns: Optional[List[str]] = None,
+                 max_dirty_paths: int = 10000):
         """
         Initialize the file watcher.
 
         Args:
             path: Root path to monitor for changes
+            ignore_patterns: Extra gitignore-style patterns to ignore on top
+                of the defaults and the repository's .gitignore
+            max_dirty_paths: Number of tracked dirty paths after which the
+                watcher gives up and requests a full rescan instead
         """
         self.path = path
         self.observer = Observer()
-        self.dependencies: Dict[str, Set[str]] = {}
-        self.ignore_patterns: Set[str] = {
-            "*.pyc",
-            "*.pyo",
-            "*.pyd",
-            "*.so",
-            "*.dylib",
-            "*.dll",
-            "__pycache__",
-            ".git",
-            ".idea",
-            ".vscode",
-            "*.swp",
-            "*.swo",
-            "node_modules",
-            "venv",
-            ".env"
-        }
+        self.dependency_graph = DependencyGraph(path)
+        self.max_dirty_paths = max_dirty_paths
+        self.ignore_patterns: Set[str] = set(self.DEFAULT_IGNORE_PATTERNS)
+        self.ignore_patterns.update(ignore_patterns or [])
+        self.matcher = IgnoreMatcher.from_repository(
+            path,
+            list(self.DEFAULT_IGNORE_PATTERNS) + list(ignore_patterns or [])
+        )
+        self._handler: Optional[FileChangeHandler] = None
+        self._shallow_watches: Set[str] = set()
+        self._listeners: List[Callable[[FileSystemEvent], None]] = []
+        self._dependency_listeners: List[Callable[[str, Set[str]], None]] = []
+        self._dirty_lock = threading.Lock()
+        self._dirty_paths: Set[str] = set()
+        # Nothing is known about the working tree until the first full scan
+        self._needs_full_scan = True
         self._setup_logging()
 
     def start_monitoring(self) -> None:
-        """Start monitoring file system changes."""
-        handler = FileChangeHandler(self._handle_change, self.ignore_patterns)
-        self.observer.schedule(handler, str(self.path), recursive=True)
+        """
+        Start monitoring file system changes.
+
+        Ignored directories are pruned from the watch schedule, so trees
+        such as node_modules or venv never generate events at all. Does
+        nothing if monitoring is already running.
+        """
+        if self.observer.is_alive():
+            return
+        self._handler = FileChangeHandler(
+            self._handle_change, self.matcher, self.path
+        )
+        _, watches = self._plan_watches(str(self.path), '')
+        for watch_path, recursive in watches:
+            self._schedule(watch_path, recursive)
+        self._handler.debouncer.start()
         self.observer.start()
-        logger.info(f"Started monitoring changes in {self.path}")
+        threading.Thread(
+            target=self._index_dependencies,
+            name="dependency-indexer",
+            daemon=True
+        ).start()
+        logger.info(
+            f"Started monitoring changes in {self.path} "
+            f"({len(watches)} watches)"
+        )
 
     def stop_monitoring(self) -> None:
-        """Stop monitoring file system changes."""
+        """Stop monitoring file system changes; it can be started again."""
         if self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
+            self._handler.debouncer.stop()
             logger.info("Stopped file monitoring")
+        if self.observer.ident is not None:
+            # Observer threads cannot be restarted
+            self.observer = Observer()
+            self._shallow_watches.clear()
+
+    def event_stats(self) -> DebounceStats:
+        """
+        Get counters for received, dropped and coalesced events.
+
+        Returns:
+            Snapshot of the event filtering and debouncing counters
+        """
+        if self._handler is None:
+            return DebounceStats()
+        stats = self._handler.debouncer.stats()
+        stats.dropped = self._handler.dropped
+        return stats
+
+    def add_listener(self, callback: Callable[[FileSystemEvent], None]) -> None:
+        """
+        Register a callback for accepted change events.
+
+        Callbacks run on the event debouncer thread and must not block.
+
+        Args:
+            callback: Function to call with each accepted event
+        """
+        self._listeners.append(callback)
+
+    def add_dependency_listener(self,
+                                callback: Callable[[str, Set[str]], None]) -> None:
+        """
+        Register a callback for files affected through dependencies.
+
+        Callbacks run on the event debouncer thread and must not block.
+
+        Args:
+            callback: Function called with the changed path and every
+                repository-relative path depending on it transitively
+        """
+        self._dependency_listeners.append(callback)
+
+    def consume_dirty_paths(self) -> Optional[Set[str]]:
+        """
+        Take the set of paths changed since the last call.
+
+        Returns:
+            Repository-relative paths touched since the last call, or None
+            if the watcher cannot vouch for the working tree and a full
+            rescan is required (startup or dirty-set overflow)
+        """
+        with self._dirty_lock:
+            dirty = None if self._needs_full_scan else self._dirty_paths
+            self._dirty_paths = set()
+            self._needs_full_scan = False
+        return dirty
+
+    def request_full_scan(self) -> None:
+        """Make the next consume_dirty_paths call request a full rescan."""
+        with self._dirty_lock:
+            self._needs_full_scan = True
+            self._dirty_paths.clear()
+
+    def seed_dirty_paths(self, paths: Set[str]) -> None:
+        """
+        Vouch for the working tree using state saved by an earlier run.
+
+        Clears the startup full-scan request; the given paths, plus any
+        changed since monitoring started, are scanned instead.
+
+        Args:
+            paths: Repository-relative paths changed since the saved state
+        """
+        with self._dirty_lock:
+            self._needs_full_scan = False
+            self._dirty_paths.update(paths)
+            if len(self._dirty_paths) > self.max_dirty_paths:
+                self._needs_full_scan = True
+                self._dirty_paths.clear()
+
+    def requeue_dirty_paths(self, paths: Iterable[str]) -> None:
+        """
+        Offer paths that were consumed but not synced to the next cycle.
+
+        Args:
+            paths: Repository-relative paths
+        """
+        with self._dirty_lock:
+            if self._needs_full_scan:
+                return
+            self._dirty_paths.update(paths)
+            if len(self._dirty_paths) > self.max_dirty_paths:
+                self._needs_full_scan = True
+                self._dirty_paths.clear()
+
+    def snapshot_tree(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Record size and modification time of every watched file.
+
+        Returns:
+            (size, mtime_ns) keyed by repository-relative path
+        """
+        with get_tracer().span('snapshot_tree', 'watcher') as span:
+            snapshot = {path: (stat.st_size, stat.st_mtime_ns)
+                        for path, stat in self._walk_files()}
+            span.set(files=len(snapshot))
+        return snapshot
+
+    def snapshot_paths(self, paths: Iterable[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+        """
+        Record size and modification time of some files.
+
+        Args:
+            paths: Repository-relative paths
+
+        Returns:
+            (size, mtime_ns) keyed by path, None for missing files
+        """
+        snapshot: Dict[str, Optional[Tuple[int, int]]] = {}
+        for path in paths:
+            try:
+                stat = os.lstat(self.path / path)
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
 
     def add_dependency(self, source: str, target: str) -> None:
         """
-        Add a file dependency relationship.
+        Add a file dependency relationship that analysis cannot discover.
 
         Args:
             source: Source file path
             target: Target file path that depends on source
         """
-        if source not in self.dependencies:
-            self.dependencies[source] = set()
-        self.dependencies[source].add(target)
+        self.dependency_graph.add_edge(self._relative(source), self._relative(target))
         logger.debug(f"Added dependency: {source} -> {target}")
 
     def get_dependencies(self, file_path: str) -> Set[str]:
         """
-        Get all files that depend on the given file.
+        Get all files that depend on the given file, directly or transitively.
 
         Args:
             file_path: Path to check dependencies for
 
         Returns:
-            Set of file paths that depend on the given file
+            Set of repository-relative paths that depend on the given file
         """
-        return self.dependencies.get(file_path, set())
+        return set(self.dependency_graph.affected(self._relative(file_path)))
 
     def _handle_change(self, event: FileSystemEvent) -> None:
         """
@@ -153,16 +360,121 @@ class FileWatcher:
         try:
             path = Path(event.src_path)
             logger.debug(f"Detected change in {path}")
+            self._mark_dirty(event)
+            self._watch_new_directory(event)
+
+            for listener in self._listeners:
+                listener(event)
 
             # Process dependencies
-            affected_files = self.get_dependencies(str(path))
-            if affected_files:
-                logger.info(f"Change in {path} affects: {affected_files}")
-                self._notify_dependency_changes(path, affected_files)
+            if event.is_directory:
+                return
+            for raw_path in (event.src_path, getattr(event, 'dest_path', '')):
+                if not raw_path:
+                    continue
+                relative = self._relative(raw_path)
+                self.dependency_graph.update(relative)
+                affected_files = self.dependency_graph.affected(relative)
+                if affected_files:
+                    logger.info(f"Change in {relative} affects: {set(affected_files)}")
+                    self._notify_dependency_changes(Path(relative), set(affected_files))
 
         except Exception as e:
             logger.error(f"Error handling file change: {e}")
 
+    def _plan_watches(self,
+                      directory: str,
+                      relative: str) -> Tuple[bool, List[Tuple[str, bool]]]:
+        """
+        Compute the smallest watch schedule that excludes ignored directories.
+
+        A subtree without ignored directories gets one recursive watch. A
+        directory containing ignored children is watched non-recursively
+        and its remaining children are planned individually.
+
+        Args:
+            directory: Absolute directory path to plan
+            relative: Directory path relative to the repository root
+
+        Returns:
+            Tuple of (subtree has no ignored directories, list of
+            (path, recursive) watches)
+        """
+        pure = True
+        child_watches: List[Tuple[str, bool]] = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f"Could not scan {directory}: {e}")
+            entries = []
+
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            child = f"{relative}/{entry.name}" if relative else entry.name
+            if self.matcher.is_ignored(child, is_dir=True):
+                pure = False
+                continue
+            child_pure, watches = self._plan_watches(entry.path, child)
+            pure = pure and child_pure
+            child_watches.extend(watches)
+
+        if pure:
+            return True, [(directory, True)]
+        return False, [(directory, False)] + child_watches
+
+    def _schedule(self, watch_path: str, recursive: bool) -> None:
+        """
+        Add a watch to the observer.
+
+        Args:
+            watch_path: Directory to watch
+            recursive: Whether to watch the whole subtree
+        """
+        self.observer.schedule(self._handler, watch_path, recursive=recursive)
+        if not recursive:
+            self._shallow_watches.add(watch_path)
+
+    def _watch_new_directory(self, event: FileSystemEvent) -> None:
+        """
+        Extend the watch schedule to directories created in shallow watches.
+
+        Args:
+            event: The accepted file system event
+        """
+        if not event.is_directory or event.event_type not in ('created', 'moved'):
+            return
+        new_path = getattr(event, 'dest_path', '') or event.src_path
+        if os.path.dirname(new_path) in self._shallow_watches:
+            self._schedule(new_path, recursive=True)
+            logger.debug(f"Watching new directory {new_path}")
+
+    def _mark_dirty(self, event: FileSystemEvent) -> None:
+        """
+        Record the paths touched by an event in the dirty set.
+
+        Args:
+            event: The file system event to record
+        """
+        # Directory modifications only mirror changes to their children
+        if event.is_directory and event.event_type == 'modified':
+            return
+
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        with self._dirty_lock:
+            if self._needs_full_scan:
+                return
+            for raw_path in paths:
+                if not raw_path:
+                    continue
+                relative = os.path.relpath(raw_path, self.path)
+                if not relative.startswith('..'):
+                    self._dirty_paths.add(Path(relative).as_posix())
+            if len(self._dirty_paths) > self.max_dirty_paths:
+                logger.info("Dirty path set overflowed, scheduling full rescan")
+                self._needs_full_scan = True
+                self._dirty_paths.clear()
+
     def _notify_dependency_changes(self, 
                                  source: Path,
                                  affected_files: Set[str]) -> None:
@@ -173,25 +485,89 @@ class FileWatcher:
             source: Source file that changed
             affected_files: Set of files affected by the change
         """
-        # TODO: Implement notification system for dependency changes
-        pass
+        for listener in self._dependency_listeners:
+            try:
+                listener(source.as_posix(), affected_files)
+            except Exception as e:
+                logger.error(f"Dependency listener failed for {source}: {e}")
 
     def analyze_dependencies(self, file_path: str) -> Set[str]:
         """
         Analyze and discover file dependencies.
 
+        The file is re-parsed, so the answer reflects its current content.
+
         Args:
             file_path: Path to analyze for dependencies
 
         Returns:
-            Set of file paths that are dependencies
+            Set of repository-relative paths the file depends on directly
+        """
+        relative = self._relative(file_path)
+        self.dependency_graph.update(relative)
+        return self.dependency_graph.dependencies(relative)
+
+    def _index_dependencies(self) -> None:
+        """Build the dependency graph for the whole tree."""
+        try:
+            with get_tracer().span('index_dependencies', 'watcher') as span:
+                paths = [path for path, _ in self._walk_files()
+                         if self.dependency_graph.tracks(path)]
+                self.dependency_graph.build(paths)
+                span.set(files=len(paths))
+        except Exception as e:
+            logger.error(f"Failed to index dependencies: {e}")
+
+    def _walk_files(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walk the tree, skipping ignored files and directories.
+
+        Yields:
+            Tuples of (repository-relative path, lstat result)
+        """
+        stack = ['']
+        while stack:
+            prefix = stack.pop()
+            try:
+                entries = os.scandir(self.path / prefix if prefix else self.path)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    path = prefix + entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if self.matcher.is_ignored(path, is_dir=is_dir):
+                            continue
+                        if is_dir:
+                            stack.append(path + '/')
+                        else:
+                            yield path, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+    def _relative(self, file_path: str) -> str:
+        """
+        Express a path relative to the repository root.
+
+        Args:
+            file_path: Absolute or repository-relative path
+
+        Returns:
+            Repository-relative path with forward slashes
         """
-        # TODO: Implement intelligent dependency analysis
-        return set()
+        if os.path.isabs(file_path):
+            file_path = os.path.relpath(file_path, self.path)
+        return Path(file_path).as_posix()
 
     def _setup_logging(self) -> None:
         """Configure logging for the file watcher."""
-        handler = logging.FileHandler("file_watcher.log")
+        # Watchers for several repositories share one log file
+        log_file = os.path.abspath("file_watcher.log")
+        if any(getattr(h, 'baseFilename', None) == log_file
+               for h in logger.handlers):
+            return
+        handler = logging.FileHandler(log_file)
         handler.setFormatter(
             logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -0,0 +1,100 @@
+"""
+Executor for blocking git operations in the MachinaForge sync system.
+
+GitPython calls block on subprocesses and file I/O. This module runs them on a
+dedicated thread pool so the event loop stays responsive, serializes all
+operations on the same repository so index updates never race, and bounds
+each operation with a timeout.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import functools
+import logging
+
+from .tracing import profiled
+
+logger = logging.getLogger(__name__)
+
+class GitExecutor:
+    """Run blocking git calls off the event loop, one at a time per repository."""
+
+    def __init__(self, max_workers: int = 4, default_timeout: float = 30.0):
+        """
+        Initialize the git executor.
+
+        Args:
+            max_workers: Number of threads available for git operations
+            default_timeout: Timeout in seconds for operations without one
+        """
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='git'
+        )
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+
+    async def run(self,
+                  repo_key: str,
+                  func: Callable[..., Any],
+                  *args: Any,
+                  operation: str = 'operation',
+                  timeout: Optional[float] = None,
+                  **kwargs: Any) -> Any:
+        """
+        Run a blocking git call on the pool.
+
+        On timeout the caller gets an error immediately, but the repository
+        stays locked until the call actually returns, so a late-finishing
+        operation can never overlap the next one.
+
+        Args:
+            repo_key: Identity of the repository, usually its path
+            func: Blocking callable to run
+            *args: Positional arguments for func
+            operation: Operation name used in logs and errors
+            timeout: Timeout in seconds, defaults to default_timeout
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            TimeoutError: If the operation does not finish in time
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        lock = self._repo_locks.setdefault(repo_key, asyncio.Lock())
+        await lock.acquire()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._pool, functools.partial(profiled(func), *args, **kwargs)
+        )
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"git {operation} on {repo_key} timed out after {timeout}s"
+            )
+            future.add_done_callback(lambda _: lock.release())
+            raise TimeoutError(
+                f"git {operation} timed out after {timeout}s"
+            ) from None
+        except BaseException:
+            if not future.done():
+                future.add_done_callback(lambda _: lock.release())
+            else:
+                lock.release()
+            raise
+        lock.release()
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the thread pool.
+
+        Args:
+            wait: Whether to wait for running operations to finish
+        """
+        self._pool.shutdown(wait=wait)
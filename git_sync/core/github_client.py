@@ -0,0 +1,201 @@
+"""
+Shared GitHub API client for the MachinaForge sync system.
+
+This module keeps one pooled aiohttp session per API endpoint and token,
+revalidates cached responses with ETag conditional requests (which GitHub
+does not count against the rate limit), waits for the rate-limit window to
+reset instead of failing when it runs low, and caches repository validation.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.github.com"
+
+@dataclass
+class CachedResponse:
+    """A cached API response with its validator."""
+
+    etag: str
+    status: int
+    data: Any
+
+@dataclass
+class RateLimit:
+    """Rate-limit state reported by the last API response."""
+
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0  # Unix timestamp
+
+class GitHubClient:
+    """Pooled, caching, rate-limit aware client for the GitHub REST API."""
+
+    def __init__(self,
+                 token: str,
+                 base_url: str = DEFAULT_API_URL,
+                 max_connections: int = 10,
+                 validation_ttl: float = 3600.0,
+                 rate_limit_reserve: int = 10,
+                 timeout: float = 30.0):
+        """
+        Initialize the GitHub client.
+
+        Args:
+            token: GitHub authentication token
+            base_url: API root, overridable for local test servers
+            max_connections: Size of the connection pool
+            validation_ttl: Seconds a successful validation stays cached
+            rate_limit_reserve: Requests kept in reserve before pausing
+                until the rate-limit window resets
+            timeout: Total timeout in seconds per request
+        """
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.validation_ttl = validation_ttl
+        self.rate_limit_reserve = rate_limit_reserve
+        self.timeout = timeout
+        self.rate_limit = RateLimit()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._cache: Dict[str, CachedResponse] = {}
+        self._validated: Dict[str, float] = {}
+
+    async def get(self, path: str) -> Tuple[int, Any]:
+        """
+        Perform a conditional GET request.
+
+        A cached ETag is sent as If-None-Match; a 304 answer returns the
+        cached body without consuming rate limit.
+
+        Args:
+            path: API path such as ``/repos/owner/name``
+
+        Returns:
+            Tuple of (status, decoded JSON body or None)
+        """
+        await self._wait_for_rate_limit()
+        session = await self._get_session()
+
+        headers = {}
+        cached = self._cache.get(path)
+        if cached:
+            headers["If-None-Match"] = cached.etag
+
+        async with session.get(self.base_url + path, headers=headers) as response:
+            self._update_rate_limit(response.headers)
+            if response.status == 304 and cached:
+                return cached.status, cached.data
+
+            data = None
+            if response.content_type == 'application/json':
+                data = await response.json()
+            etag = response.headers.get("ETag")
+            if response.status == 200 and etag:
+                self._cache[path] = CachedResponse(etag, response.status, data)
+            return response.status, data
+
+    async def validate_repository(self, repository: str) -> None:
+        """
+        Validate credentials and access to a repository.
+
+        Successful validations are cached for ``validation_ttl`` seconds.
+
+        Args:
+            repository: Repository in ``owner/name`` format
+
+        Raises:
+            ConnectionError: If the repository is not accessible
+        """
+        validated_at = self._validated.get(repository)
+        if validated_at and time.monotonic() - validated_at < self.validation_ttl:
+            return
+
+        status, _ = await self.get(f"/repos/{repository}")
+        if status != 200:
+            self._validated.pop(repository, None)
+            raise ConnectionError("Failed to validate GitHub credentials")
+        self._validated[repository] = time.monotonic()
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session, creating it on first use.
+
+        Returns:
+            Open client session
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "Authorization": f"token {self.token}",
+                    "Accept": "application/vnd.github.v3+json"
+                }
+            )
+        return self._session
+
+    def _update_rate_limit(self, headers: Any) -> None:
+        """
+        Record rate-limit headers from a response.
+
+        Args:
+            headers: Response headers
+        """
+        try:
+            if "X-RateLimit-Remaining" in headers:
+                self.rate_limit.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Limit" in headers:
+                self.rate_limit.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Reset" in headers:
+                self.rate_limit.reset_at = float(headers["X-RateLimit-Reset"])
+        except ValueError:
+            logger.debug("Ignoring malformed rate-limit headers")
+
+    async def _wait_for_rate_limit(self) -> None:
+        """Pause until the rate-limit window resets if the budget is low."""
+        remaining = self.rate_limit.remaining
+        if remaining is None or remaining > self.rate_limit_reserve:
+            return
+        delay = self.rate_limit.reset_at - time.time()
+        if delay > 0:
+            logger.warning(
+                f"GitHub rate limit low ({remaining} left), "
+                f"pausing {delay:.0f}s until reset"
+            )
+            await asyncio.sleep(delay)
+        self.rate_limit.remaining = None
+
+_clients: Dict[Tuple[str, str], GitHubClient] = {}
+
+def get_client(token: str, base_url: str = DEFAULT_API_URL) -> GitHubClient:
+    """
+    Get the process-wide client for a token and API endpoint.
+
+    Args:
+        token: GitHub authentication token
+        base_url: API root
+
+    Returns:
+        Shared client instance
+    """
+    key = (token, base_url)
+    if key not in _clients:
+        _clients[key] = GitHubClient(token, base_url)
+    return _clients[key]
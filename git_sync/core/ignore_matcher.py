@@ -0,0 +1,234 @@
+"""
+Gitignore-style path matching for the MachinaForge file watcher.
+
+This module compiles ignore patterns once into combined regular expressions
+and caches per-directory decisions, so filtering a file system event costs a
+dictionary lookup for its parent directory and a single regex match.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IgnoreMatcher:
+    """Match repository-relative paths against gitignore-style patterns."""
+
+    # Directory decisions are cheap to recompute, so the cache is simply
+    # reset once it grows past this many entries
+    MAX_CACHED_DIRS = 65536
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        """
+        Initialize the matcher.
+
+        Patterns follow .gitignore semantics: ``*``, ``?``, ``[...]`` and
+        ``**`` wildcards, a leading or inner ``/`` anchors the pattern to the
+        repository root, a trailing ``/`` matches directories only, and a
+        leading ``!`` re-includes paths excluded by earlier patterns.
+
+        Args:
+            patterns: Ignore patterns in priority order, last match wins
+        """
+        self.patterns: List[str] = []
+        self._negated: List[bool] = []
+        self._file_regex: Optional[re.Pattern] = None
+        self._dir_regex: Optional[re.Pattern] = None
+        self._dir_cache: Dict[str, bool] = {}
+        self.add_patterns(patterns)
+
+    @classmethod
+    def from_repository(cls,
+                        root: Path,
+                        patterns: Iterable[str] = ()) -> 'IgnoreMatcher':
+        """
+        Create a matcher honoring the repository's own ignore files.
+
+        Args:
+            root: Repository root containing .gitignore
+            patterns: Additional patterns, taking precedence over the files
+
+        Returns:
+            Compiled matcher
+        """
+        collected: List[str] = []
+        for ignore_file in (root / '.git' / 'info' / 'exclude',
+                            root / '.gitignore'):
+            try:
+                collected.extend(ignore_file.read_text().splitlines())
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Could not read {ignore_file}: {e}")
+        collected.extend(patterns)
+        return cls(collected)
+
+    def add_patterns(self, patterns: Iterable[str]) -> None:
+        """
+        Append patterns and recompile the matcher.
+
+        Args:
+            patterns: Ignore patterns to append
+        """
+        self.patterns.extend(patterns)
+        self._compile()
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check whether a path is ignored.
+
+        A path inside an ignored directory is always ignored, as in git.
+
+        Args:
+            path: Repository-relative path using ``/`` separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the path should be ignored
+        """
+        parent = path.rpartition('/')[0]
+        if parent and self._is_dir_ignored(parent):
+            return True
+        return self._match(path, is_dir)
+
+    def _is_dir_ignored(self, directory: str) -> bool:
+        """
+        Check whether a directory or any of its ancestors is ignored.
+
+        Args:
+            directory: Repository-relative directory path
+
+        Returns:
+            True if the directory is ignored
+        """
+        ignored = self._dir_cache.get(directory)
+        if ignored is None:
+            ignored = self.is_ignored(directory, is_dir=True)
+            if len(self._dir_cache) >= self.MAX_CACHED_DIRS:
+                self._dir_cache.clear()
+            self._dir_cache[directory] = ignored
+        return ignored
+
+    def _match(self, path: str, is_dir: bool) -> bool:
+        """
+        Match a single path against the compiled patterns.
+
+        Args:
+            path: Repository-relative path
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the last matching pattern ignores the path
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+        match = regex.fullmatch(path)
+        if match is None:
+            return False
+        return not self._negated[int(match.lastgroup[1:])]
+
+    def _compile(self) -> None:
+        """Compile all patterns into combined file and directory regexes."""
+        self._negated = []
+        file_rules: List[str] = []
+        dir_rules: List[str] = []
+        for pattern in self.patterns:
+            translated = _translate(pattern)
+            if translated is None:
+                continue
+            regex, negated, dir_only = translated
+            index = len(self._negated)
+            self._negated.append(negated)
+            rule = f"(?P<r{index}>{regex})"
+            dir_rules.append(rule)
+            if not dir_only:
+                file_rules.append(rule)
+
+        # Alternatives are tried left to right, so listing the rules in
+        # reverse makes the last matching pattern win as in .gitignore
+        self._file_regex = (re.compile('|'.join(reversed(file_rules)))
+                            if file_rules else None)
+        self._dir_regex = (re.compile('|'.join(reversed(dir_rules)))
+                           if dir_rules else None)
+        self._dir_cache.clear()
+
+def _translate(pattern: str) -> Optional[Tuple[str, bool, bool]]:
+    """
+    Translate a gitignore pattern into a regular expression.
+
+    Args:
+        pattern: A single line from an ignore file
+
+    Returns:
+        Tuple of (regex, negated, dir_only), or None for blank lines
+        and comments
+    """
+    if not pattern.strip() or pattern.startswith('#'):
+        return None
+
+    negated = pattern.startswith('!')
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith(('\\!', '\\#')):
+        pattern = pattern[1:]
+
+    # Trailing spaces are ignored unless escaped
+    if not pattern.endswith('\\ '):
+        pattern = pattern.rstrip(' ')
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    anchored = '/' in pattern
+    segments = pattern.lstrip('/').split('/')
+    parts = [] if anchored else ['(?:.*/)?']
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            parts.append('.*' if last else '(?:.*/)?')
+        else:
+            parts.append(_translate_segment(segment) + ('' if last else '/'))
+    return ''.join(parts), negated, dir_only
+
+def _translate_segment(segment: str) -> str:
+    """
+    Translate one path segment of a gitignore pattern.
+
+    Args:
+        segment: Pattern segment without ``/`` separators
+
+    Returns:
+        Regular expression matching the segment
+    """
+    result = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == '*':
+            result.append('[^/]*')
+            while i + 1 < len(segment) and segment[i + 1] == '*':
+                i += 1
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '\\' and i + 1 < len(segment):
+            i += 1
+            result.append(re.escape(segment[i]))
+        elif char == '[':
+            end = segment.find(']', i + 2)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                body = segment[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                result.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return ''.join(result)
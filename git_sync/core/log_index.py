@@ -0,0 +1,438 @@
+"""
+Time-indexed access to MachinaForge service logs.
+
+Logs under System/Logs write one entry per ``[ISO-timestamp] message`` line,
+optionally followed by untimestamped continuation lines. This module scans
+a log through mmap in a single streaming pass and keeps a sidecar index of
+(time, offset) points, so time-range queries seek close to their start
+instead of reading the whole file. Only bytes appended since the last pass
+are indexed; a truncated or replaced log is reindexed from scratch.
+
+Entries can be aggregated per minute, e.g. the ``Processed X in Nms`` lines
+of batch_processing.log into latency percentiles::
+
+    python3 -m git_sync.core.log_index System/Logs/batch_processing.log --stats
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_PATTERN = re.compile(
+    rb'^\[(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?)\] ?',
+    re.MULTILINE
+)
+
+# Durations reported by the batch processor
+PROCESSED_PATTERN = r'Processed \S+ in (\d+(?:\.\d+)?)ms'
+
+@dataclass
+class LogEntry:
+    """One timestamped log entry with its continuation lines."""
+
+    timestamp: float  # Unix time
+    offset: int  # byte offset of the entry in the log
+    message: str
+
+@dataclass
+class MinuteStats:
+    """Aggregate of matching entries within one minute."""
+
+    minute: float  # Unix time of the minute start
+    count: int
+    total: float
+    quantiles: Dict[float, float] = field(default_factory=dict)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+class LogIndex:
+    """Sparse time/offset index of a log file, stored in a sidecar file."""
+
+    MAGIC = b'MFLI'
+    VERSION = 1
+    # magic, version, point count, indexed bytes, inode, head checksum,
+    # latest timestamp, offset of the last point
+    HEADER = struct.Struct('<4sIQQQIdQ')
+    # latest timestamp of all entries before the offset, offset
+    POINT = struct.Struct('<dQ')
+    HEAD_BYTES = 256
+
+    def __init__(self,
+                 log_path: Path,
+                 index_path: Optional[Path] = None,
+                 stride: int = 16384):
+        """
+        Initialize the index.
+
+        Args:
+            log_path: Log file to index
+            index_path: Sidecar file, defaults to one under the repository's
+                git directory so it is never synced
+            stride: Minimum bytes between index points
+        """
+        self.log_path = Path(log_path)
+        self.index_path = index_path or default_index_path(self.log_path)
+        self.stride = stride
+        self._points: List[Tuple[float, int]] = []
+        self._indexed = 0
+        self._inode = 0
+        self._head = 0
+        self._latest = float('-inf')
+        self._last_point = -1
+        self._loaded = False
+        self._timestamps: Dict[bytes, Optional[float]] = {}
+
+    def update(self) -> int:
+        """
+        Index bytes appended to the log since the last update.
+
+        A partially written last line is left for the next update.
+
+        Returns:
+            Number of entries indexed
+        """
+        self._load()
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+        if stat.st_size == 0:
+            if self._indexed:
+                self._reset(stat.st_ino)
+            return 0
+        with open(self.log_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                head = zlib.crc32(mm[:min(self.HEAD_BYTES, self._indexed or self.HEAD_BYTES)])
+                if (stat.st_size < self._indexed or stat.st_ino != self._inode
+                        or (self._indexed and head != self._head)):
+                    if self._indexed:
+                        logger.info(f"{self.log_path} was truncated or replaced, reindexing")
+                    self._reset(stat.st_ino)
+
+                end = mm.rfind(b'\n', self._indexed) + 1
+                if end <= self._indexed:
+                    return 0
+                start_points = len(self._points)
+                count = 0
+                for match, timestamp in self._matches(mm, self._indexed, end):
+                    offset = match.start()
+                    if self._last_point < 0 or offset - self._last_point >= self.stride:
+                        self._points.append((self._latest, offset))
+                        self._last_point = offset
+                    self._latest = max(self._latest, timestamp)
+                    count += 1
+
+                # The head checksum covers what was indexed when that was
+                # less than HEAD_BYTES, so later appends don't look like a
+                # replaced file
+                self._head = zlib.crc32(mm[:min(self.HEAD_BYTES, end)])
+                self._indexed = end
+        self._save(start_points)
+        return count
+
+    def entries(self,
+                since: Optional[float] = None,
+                until: Optional[float] = None) -> Iterator[LogEntry]:
+        """
+        Iterate over entries in a time range, updating the index first.
+
+        Entries are expected in time order, as written by appending
+        services; iteration stops at the first entry at or after ``until``.
+
+        Args:
+            since: Start of the range as Unix time
+            until: End of the range as Unix time
+
+        Yields:
+            Entries with since <= timestamp < until
+        """
+        self.update()
+        if not self._indexed:
+            return
+        start = 0
+        if since is not None and self._points:
+            # Everything before a point is older than its recorded time
+            i = bisect.bisect_left([point[0] for point in self._points], since)
+            start = self._points[max(i - 1, 0)][1]
+
+        with open(self.log_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                previous = None
+                for match, timestamp in self._matches(mm, start, self._indexed):
+                    if previous is not None:
+                        yield self._entry(mm, *previous, match.start())
+                    if until is not None and timestamp >= until:
+                        return
+                    previous = (match, timestamp) if since is None or timestamp >= since else None
+                if previous is not None:
+                    yield self._entry(mm, *previous, self._indexed)
+
+    def minute_stats(self,
+                     pattern: str = PROCESSED_PATTERN,
+                     since: Optional[float] = None,
+                     until: Optional[float] = None,
+                     quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> List[MinuteStats]:
+        """
+        Aggregate a value reported by matching entries per minute.
+
+        Args:
+            pattern: Regular expression whose first group is the value;
+                entries not matching it are ignored
+            since: Start of the range as Unix time
+            until: End of the range as Unix time
+            quantiles: Quantiles to compute, between 0 and 1
+
+        Returns:
+            Statistics per minute with at least one match, in time order
+        """
+        regex = re.compile(pattern)
+        minutes: Dict[float, List[float]] = {}
+        for entry in self.entries(since, until):
+            match = regex.search(entry.message)
+            if match:
+                minute = entry.timestamp // 60 * 60
+                minutes.setdefault(minute, []).append(float(match.group(1)))
+
+        stats = []
+        for minute in sorted(minutes):
+            values = sorted(minutes[minute])
+            stats.append(MinuteStats(
+                minute,
+                len(values),
+                sum(values),
+                {q: values[min(len(values) - 1, int(len(values) * q))] for q in quantiles}
+            ))
+        return stats
+
+    def _matches(self,
+                 mm: mmap.mmap,
+                 start: int,
+                 end: int) -> Iterator[Tuple[re.Match, float]]:
+        """
+        Find the entry starts in a byte range.
+
+        Lines whose timestamp is shaped right but not a valid time, such as
+        month 13, are treated as continuation lines.
+
+        Args:
+            mm: Mapped log
+            start: Offset to search from
+            end: Offset to search to
+
+        Yields:
+            Timestamp match and Unix time of each entry
+        """
+        for match in ENTRY_PATTERN.finditer(mm, start, end):
+            timestamp = self._parse_time(match.group(1))
+            if timestamp is not None:
+                yield match, timestamp
+
+    def _entry(self,
+               mm: mmap.mmap,
+               match: re.Match,
+               timestamp: float,
+               end: int) -> LogEntry:
+        """
+        Build an entry from its timestamp match.
+
+        Args:
+            mm: Mapped log
+            match: Timestamp match of the entry
+            timestamp: Unix time of the entry
+            end: Offset where the next entry starts
+
+        Returns:
+            Entry with its message and continuation lines
+        """
+        return LogEntry(
+            timestamp,
+            match.start(),
+            mm[match.end():end].decode('utf-8', errors='replace').rstrip('\n')
+        )
+
+    def _parse_time(self, value: bytes) -> Optional[float]:
+        """
+        Parse an ISO timestamp, caching repeated values.
+
+        Args:
+            value: Timestamp bytes
+
+        Returns:
+            Unix time, or None if the timestamp is not a valid time
+        """
+        if value in self._timestamps:
+            return self._timestamps[value]
+        if len(self._timestamps) > 4096:
+            self._timestamps.clear()
+        try:
+            timestamp = _parse_iso(value.decode())
+        except ValueError:
+            timestamp = None
+        self._timestamps[value] = timestamp
+        return timestamp
+
+    def _reset(self, inode: int) -> None:
+        """
+        Forget all index points.
+
+        Args:
+            inode: Inode of the log being indexed
+        """
+        self._points = []
+        self._indexed = 0
+        self._inode = inode
+        self._head = 0
+        self._latest = float('-inf')
+        self._last_point = -1
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load(self) -> None:
+        """Read the sidecar index if not loaded yet."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = self.index_path.read_bytes()
+            (magic, version, count, indexed, inode, head,
+             latest, last_point) = self.HEADER.unpack_from(data)
+        except (FileNotFoundError, struct.error):
+            return
+        body = data[self.HEADER.size:self.HEADER.size + count * self.POINT.size]
+        if magic != self.MAGIC or version != self.VERSION or len(body) != count * self.POINT.size:
+            logger.info(f"Ignoring unreadable log index {self.index_path}")
+            return
+        self._points = list(self.POINT.iter_unpack(body))
+        self._indexed, self._inode, self._head = indexed, inode, head
+        self._latest, self._last_point = latest, last_point
+
+    def _save(self, start_points: int) -> None:
+        """
+        Append new points to the sidecar index and update its header.
+
+        Points beyond the count in the header are ignored on load, so an
+        interrupted save only loses the latest pass.
+
+        Args:
+            start_points: Number of points already in the sidecar file
+        """
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, len(self._points), self._indexed,
+            self._inode, self._head, self._latest, self._last_point
+        )
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            mode = 'r+b' if start_points and self.index_path.exists() else 'wb'
+            if mode == 'wb':
+                start_points = 0
+            with open(self.index_path, mode) as f:
+                f.seek(self.HEADER.size + start_points * self.POINT.size)
+                f.write(b''.join(self.POINT.pack(*point)
+                                 for point in self._points[start_points:]))
+                f.truncate()
+                f.seek(0)
+                f.write(header)
+        except OSError as e:
+            logger.warning(f"Could not save log index {self.index_path}: {e}")
+
+def default_index_path(log_path: Path) -> Path:
+    """
+    Choose the sidecar index location for a log.
+
+    Indexes of logs inside a git repository go under its git directory so
+    the sync engine never commits them; other logs get a hidden sidecar.
+
+    Args:
+        log_path: Log file
+
+    Returns:
+        Index file path
+    """
+    path = log_path.resolve()
+    for parent in path.parents:
+        if (parent / '.git').is_dir():
+            name = str(path.relative_to(parent)).replace(os.sep, '__')
+            return parent / '.git' / 'machinaforge' / 'log-index' / f'{name}.idx'
+    return path.with_name(f'.{path.name}.idx')
+
+def _parse_iso(value: str) -> float:
+    """
+    Convert an ISO 8601 timestamp to Unix time, assuming UTC if unzoned.
+
+    Args:
+        value: Timestamp such as ``2025-06-01T16:53:33Z``
+
+    Returns:
+        Unix time
+    """
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def _format_time(timestamp: float) -> str:
+    """
+    Format Unix time like the log timestamps.
+
+    Args:
+        timestamp: Unix time
+
+    Returns:
+        UTC ISO timestamp
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def main() -> int:
+    """
+    Query a log by time range or aggregate it per minute.
+
+    Returns:
+        Exit status
+    """
+    parser = argparse.ArgumentParser(description="Query MachinaForge logs by time")
+    parser.add_argument('log', type=Path, help="Log file")
+    parser.add_argument('--since', help="ISO timestamp of the range start")
+    parser.add_argument('--until', help="ISO timestamp of the range end")
+    parser.add_argument('--stats', action='store_true',
+                        help="Print per-minute percentiles instead of entries")
+    parser.add_argument('--pattern', default=PROCESSED_PATTERN,
+                        help="Regex whose first group is the value for --stats")
+    parser.add_argument('--index', type=Path, help="Sidecar index file")
+    args = parser.parse_args()
+
+    index = LogIndex(args.log, args.index)
+    since = _parse_iso(args.since) if args.since else None
+    until = _parse_iso(args.until) if args.until else None
+    try:
+        if args.stats:
+            for stats in index.minute_stats(args.pattern, since, until):
+                quantiles = ' '.join(f"p{int(q * 100)}={value:g}"
+                                     for q, value in stats.quantiles.items())
+                print(f"{_format_time(stats.minute)} count={stats.count} "
+                      f"mean={stats.mean:.1f} {quantiles}")
+        else:
+            for entry in index.entries(since, until):
+                print(f"[{_format_time(entry.timestamp)}] {entry.message}")
+    except BrokenPipeError:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Manual section handling for generated MachinaForge documents.
+
+Generated documents may contain hand-written sections between
+``<!-- MANUAL_SECTION_START:name -->`` and ``<!-- MANUAL_SECTION_END -->``.
+Templates mark where they go with ``<!-- MANUAL_SECTION:name -->``.
+
+Both directions are a single scan over the document. Extraction reads the
+file through a memory map and decodes only the section bodies, and
+restoration joins the output once, so large documents are not copied per
+section.
+"""
+
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MARKER = re.compile(rb'<!-- MANUAL_SECTION_(?:START:(\w+)|END) -->')
+_PLACEHOLDER = re.compile(r'<!-- MANUAL_SECTION:(\w+) -->')
+
+def extract_manual_sections(path: Path) -> Dict[str, str]:
+    """
+    Read the manual sections of a document.
+
+    Args:
+        path: Document to read
+
+    Returns:
+        Section contents keyed by section name
+    """
+    sections: Dict[str, str] = {}
+    try:
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return sections
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                name = None
+                body_start = 0
+                for match in _MARKER.finditer(data):
+                    if match.group(1) is not None:
+                        # A second start before an end restarts the section
+                        name = match.group(1).decode()
+                        body_start = match.end()
+                    elif name is not None:
+                        sections[name] = data[body_start:match.start()].decode().strip()
+                        name = None
+    except FileNotFoundError:
+        pass
+    if sections:
+        logger.debug(f"Preserved {len(sections)} manual sections from {path}")
+    return sections
+
+def restore_manual_sections(content: str, sections: Dict[str, str]) -> str:
+    """
+    Replace section placeholders with preserved manual content.
+
+    Placeholders without preserved content are left in place.
+
+    Args:
+        content: Rendered document
+        sections: Section contents keyed by section name
+
+    Returns:
+        Document with manual sections spliced in
+    """
+    if not sections:
+        return content
+
+    parts: List[str] = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(content):
+        name = match.group(1)
+        if name not in sections:
+            continue
+        parts.append(content[position:match.start()])
+        parts.append(
+            f"<!-- MANUAL_SECTION_START:{name} -->\n"
+            f"{sections[name]}\n"
+            f"<!-- MANUAL_SECTION_END -->"
+        )
+        position = match.end()
+    if not parts:
+        return content
+    parts.append(content[position:])
+    return ''.join(parts)
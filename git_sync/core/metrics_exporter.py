@@ -0,0 +1,147 @@
+"""
+Prometheus exporter for MachinaForge sync metrics.
+
+Serves the metrics stores of all repositories in the Prometheus text
+exposition format on a local port. Every metric becomes a summary with recent quantiles, a running
+sum and count; the latest value is exported as a separate gauge.
+"""
+
+import asyncio
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+
+from aiohttp import web
+
+from .metrics_store import MetricsStore
+
+logger = logging.getLogger(__name__)
+
+class MetricsExporter:
+    """HTTP endpoint exposing metrics stores to Prometheus."""
+
+    PREFIX = 'machinaforge_'
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self,
+                 stores: Iterable[MetricsStore],
+                 host: str = '127.0.0.1',
+                 port: int = 9464,
+                 window: float = 900.0,
+                 before_scrape: Optional[Callable[[], None]] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            stores: Metrics stores to export; repositories with their own
+                log directory each have one
+            host: Interface to listen on
+            port: Port to listen on
+            window: Seconds of samples the quantiles are computed over
+            before_scrape: Called before each scrape, e.g. to ingest
+                samples written by the git hooks
+        """
+        # Repositories sharing a log directory share a store
+        self.stores = list({id(store): store for store in stores}.values())
+        self.host = host
+        self.port = port
+        self.window = window
+        self.before_scrape = before_scrape
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        """Start serving ``/metrics``."""
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Blocking; queries the metrics stores.
+
+        Returns:
+            Exposition text
+        """
+        if self.before_scrape is not None:
+            try:
+                self.before_scrape()
+            except Exception as e:
+                logger.warning(f"Metrics pre-scrape hook failed: {e}")
+
+        since = time.time() - self.window
+        summaries: Dict[str, List[str]] = {}
+        gauges: Dict[str, List[str]] = {}
+        for store in self.stores:
+            for total in store.totals():
+                metric = self.PREFIX + _sanitize(total.name)
+                labels = f'repository="{_escape(total.repository)}"'
+                lines = summaries.setdefault(metric, [])
+                quantiles = store.percentiles(
+                    total.name, total.repository, since, self.QUANTILES
+                )
+                for quantile, value in quantiles.items():
+                    lines.append(f'{metric}{{{labels},quantile="{quantile}"}} {value!r}')
+                lines.append(f'{metric}_sum{{{labels}}} {total.total!r}')
+                lines.append(f'{metric}_count{{{labels}}} {total.count}')
+                gauges.setdefault(metric + '_last', []).append(
+                    f'{metric}_last{{{labels}}} {total.last!r}'
+                )
+
+        output = []
+        for kind, families in (('summary', summaries), ('gauge', gauges)):
+            for metric, lines in families.items():
+                output.append(f"# TYPE {metric} {kind}")
+                output.extend(lines)
+        return "\n".join(output) + "\n"
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        """
+        Serve a scrape.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            Exposition response
+        """
+        body = await asyncio.to_thread(self.render)
+        return web.Response(
+            body=body.encode(),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
+
+def _sanitize(name: str) -> str:
+    """
+    Make a metric name valid for Prometheus.
+
+    Args:
+        name: Metric name
+
+    Returns:
+        Name containing only letters, digits and underscores
+    """
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value.
+
+    Args:
+        value: Raw label value
+
+    Returns:
+        Value safe inside double quotes
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,366 @@
+"""
+Sync metrics storage for the MachinaForge sync system.
+
+Samples such as cycle durations, stage timings, change counts and failures
+are recorded into a SQLite database under the log directory. Raw samples
+form a bounded ring buffer for percentiles over recent windows, per-minute
+rollups answer range queries cheaply, and running totals back the
+Prometheus exporter. Lines appended by the git hooks to a JSON Lines file
+can be ingested incrementally.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Rollup:
+    """Aggregate of one metric over a time bucket."""
+
+    bucket: float  # Unix timestamp of the bucket start
+    count: int
+    total: float
+    minimum: float
+    maximum: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+@dataclass
+class MetricTotal:
+    """Running totals and latest value of one metric."""
+
+    repository: str
+    name: str
+    count: int
+    total: float
+    last: float
+
+class MetricsStore:
+    """Ring buffer of samples with per-minute rollups in SQLite."""
+
+    ROLLUP_SECONDS = 60
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            repository TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS samples_metric
+            ON samples (name, repository, ts);
+        CREATE TABLE IF NOT EXISTS rollups (
+            bucket INTEGER NOT NULL,
+            repository TEXT NOT NULL,
+            name TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            total REAL NOT NULL,
+            minimum REAL NOT NULL,
+            maximum REAL NOT NULL,
+            PRIMARY KEY (name, repository, bucket)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS totals (
+            repository TEXT NOT NULL,
+            name TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            total REAL NOT NULL,
+            last REAL NOT NULL,
+            PRIMARY KEY (name, repository)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ingested (
+            path TEXT PRIMARY KEY,
+            offset INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self,
+                 path: Path,
+                 max_samples: int = 100000,
+                 rollup_retention: float = 90 * 86400.0):
+        """
+        Open or create the metrics database.
+
+        Args:
+            path: Database file
+            max_samples: Raw samples kept before the oldest are dropped
+            rollup_retention: Seconds per-minute rollups are kept
+        """
+        self.path = path
+        self.max_samples = max_samples
+        self.rollup_retention = rollup_retention
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+        self._writes = 0
+
+    def record(self,
+               repository: str,
+               name: str,
+               value: float,
+               timestamp: Optional[float] = None) -> None:
+        """
+        Record one sample.
+
+        Args:
+            repository: Repository the sample belongs to
+            name: Metric name, e.g. ``sync_duration_seconds``
+            value: Sample value
+            timestamp: Unix time of the sample, defaults to now
+        """
+        self.record_many([(repository, name, value)], timestamp)
+
+    def record_many(self,
+                    samples: List[Tuple[str, str, float]],
+                    timestamp: Optional[float] = None) -> None:
+        """
+        Record several samples in one transaction.
+
+        Args:
+            samples: List of (repository, name, value) tuples
+            timestamp: Unix time of the samples, defaults to now
+        """
+        if not samples:
+            return
+        ts = time.time() if timestamp is None else timestamp
+        bucket = int(ts // self.ROLLUP_SECONDS * self.ROLLUP_SECONDS)
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO samples (ts, repository, name, value) VALUES (?, ?, ?, ?)",
+                ((ts, repository, name, value) for repository, name, value in samples)
+            )
+            self._db.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (name, repository, bucket) DO UPDATE SET "
+                "count = count + 1, total = total + excluded.total, "
+                "minimum = min(minimum, excluded.minimum), "
+                "maximum = max(maximum, excluded.maximum)",
+                ((bucket, repository, name, value, value, value)
+                 for repository, name, value in samples)
+            )
+            self._db.executemany(
+                "INSERT INTO totals VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (name, repository) DO UPDATE SET "
+                "count = count + 1, total = total + excluded.total, "
+                "last = excluded.last",
+                ((repository, name, value, value)
+                 for repository, name, value in samples)
+            )
+            self._writes += len(samples)
+            if self._writes >= self.max_samples // 10:
+                self._trim(ts)
+
+    def query(self,
+              name: str,
+              repository: Optional[str] = None,
+              since: Optional[float] = None,
+              until: Optional[float] = None,
+              step: int = ROLLUP_SECONDS) -> List[Rollup]:
+        """
+        Aggregate a metric over time buckets.
+
+        Args:
+            name: Metric name
+            repository: Limit to one repository, or None for all
+            since: Start of the range as Unix time
+            until: End of the range as Unix time
+            step: Bucket width in seconds, a multiple of one minute
+
+        Returns:
+            Rollups in ascending bucket order
+        """
+        step = max(self.ROLLUP_SECONDS, step // self.ROLLUP_SECONDS * self.ROLLUP_SECONDS)
+        clauses, params = self._filters(name, repository, since, until, 'bucket')
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT bucket / {step} * {step} AS b, sum(count), sum(total), "
+                f"min(minimum), max(maximum) FROM rollups WHERE {clauses} "
+                f"GROUP BY b ORDER BY b",
+                params
+            ).fetchall()
+        return [Rollup(*row) for row in rows]
+
+    def percentiles(self,
+                    name: str,
+                    repository: Optional[str] = None,
+                    since: Optional[float] = None,
+                    quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[float, float]:
+        """
+        Compute percentiles of a metric from raw samples.
+
+        Only samples still in the ring buffer are considered.
+
+        Args:
+            name: Metric name
+            repository: Limit to one repository, or None for all
+            since: Start of the window as Unix time
+            quantiles: Quantiles to compute, between 0 and 1
+
+        Returns:
+            Value per quantile, empty if there are no samples
+        """
+        clauses, params = self._filters(name, repository, since, None, 'ts')
+        with self._lock:
+            values = [row[0] for row in self._db.execute(
+                f"SELECT value FROM samples WHERE {clauses} ORDER BY value",
+                params
+            )]
+        if not values:
+            return {}
+        return {q: values[min(len(values) - 1, int(len(values) * q))]
+                for q in quantiles}
+
+    def totals(self) -> List[MetricTotal]:
+        """
+        Get running totals of every metric.
+
+        Returns:
+            Totals per repository and metric name
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT repository, name, count, total, last FROM totals "
+                "ORDER BY name, repository"
+            ).fetchall()
+        return [MetricTotal(*row) for row in rows]
+
+    def ingest_jsonl(self, path: Path, repository: str = '') -> int:
+        """
+        Import samples appended to a JSON Lines file since the last call.
+
+        Each line holds ``ts`` (Unix time) and numeric fields; every numeric
+        field except ``ts`` becomes a sample named after the field. The
+        git hooks write such lines instead of rewriting a JSON document.
+
+        Args:
+            path: File to read
+            repository: Repository the samples belong to
+
+        Returns:
+            Number of lines imported
+        """
+        key = str(path.resolve())
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset FROM ingested WHERE path = ?", (key,)
+            ).fetchone()
+        offset = row[0] if row else 0
+
+        try:
+            with open(path, 'rb') as f:
+                if f.seek(0, 2) < offset:
+                    offset = 0  # truncated or replaced
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        # Leave a partially written last line for the next call
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].splitlines()
+
+        imported = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                ts = float(entry.pop('ts'))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+            samples = [(repository, field, float(value))
+                       for field, value in entry.items()
+                       if isinstance(value, (int, float)) and not isinstance(value, bool)]
+            self.record_many(samples, ts)
+            imported += 1
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ingested VALUES (?, ?)",
+                (key, offset + end)
+            )
+        return imported
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def _filters(self,
+                 name: str,
+                 repository: Optional[str],
+                 since: Optional[float],
+                 until: Optional[float],
+                 column: str) -> Tuple[str, List]:
+        """
+        Build a WHERE clause for metric queries.
+
+        Args:
+            name: Metric name
+            repository: Repository or None
+            since: Lower time bound or None
+            until: Upper time bound or None
+            column: Time column to bound
+
+        Returns:
+            Tuple of (clause, parameters)
+        """
+        clauses, params = ["name = ?"], [name]
+        if repository is not None:
+            clauses.append("repository = ?")
+            params.append(repository)
+        if since is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{column} < ?")
+            params.append(until)
+        return " AND ".join(clauses), params
+
+    def _trim(self, now: float) -> None:
+        """
+        Drop samples beyond the ring size and expired rollups.
+
+        Called with the lock held, inside a transaction.
+
+        Args:
+            now: Current Unix time
+        """
+        self._writes = 0
+        self._db.execute(
+            "DELETE FROM samples WHERE id <= "
+            "(SELECT max(id) FROM samples) - ?",
+            (self.max_samples,)
+        )
+        self._db.execute(
+            "DELETE FROM rollups WHERE bucket < ?",
+            (now - self.rollup_retention,)
+        )
+
+_stores: Dict[Path, MetricsStore] = {}
+_stores_lock = threading.Lock()
+
+def get_metrics_store(path: Path) -> MetricsStore:
+    """
+    Get the process-wide metrics store for a database file.
+
+    Args:
+        path: Database file
+
+    Returns:
+        Shared store instance
+    """
+    key = Path(path).resolve()
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = MetricsStore(key)
+        return _stores[key]
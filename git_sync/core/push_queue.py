@@ -0,0 +1,246 @@
+"""
+Coalescing push queue for the MachinaForge sync engine.
+
+Commits request a push instead of pushing inline. Requests that arrive while
+a push is pending or in flight are folded into the next push, so a burst of
+commits costs one round-trip. Failed pushes are retried with decorrelated
+jitter so many repositories do not retry in lockstep, and rejected
+non-fast-forward pushes pull before retrying. A push that gives up is
+requested again after an exponentially growing delay, so commits of a quiet
+repository still reach the remote once it is reachable again.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Optional
+import logging
+import random
+import time
+
+from git.exc import GitCommandError
+
+logger = logging.getLogger(__name__)
+
+class PushRejectedError(Exception):
+    """The remote rejected a push because it is not a fast-forward."""
+
+@dataclass
+class PushStats:
+    """Counters and latency percentiles for the push queue."""
+
+    requests: int = 0
+    pushes: int = 0
+    coalesced: int = 0  # requests satisfied by another request's push
+    retries: int = 0
+    repulls: int = 0
+    failures: int = 0
+    latency_p50: float = 0.0
+    latency_p95: float = 0.0
+    latency_p99: float = 0.0
+
+class PushQueue:
+    """Coalesce push requests and push them in the background."""
+
+    NON_FAST_FORWARD_MARKERS = ('non-fast-forward', 'fetch first', '[rejected]')
+
+    def __init__(self,
+                 push: Callable[[], Awaitable[None]],
+                 repull: Callable[[], Awaitable[None]],
+                 max_retries: int = 3,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 coalesce_delay: float = 0.5,
+                 max_failure_delay: float = 900.0,
+                 on_failure: Optional[Callable[[Exception], Awaitable[None]]] = None,
+                 on_pushed: Optional[Callable[[float], None]] = None):
+        """
+        Initialize the push queue.
+
+        Args:
+            push: Coroutine function pushing all local commits
+            repull: Coroutine function integrating remote commits after a
+                non-fast-forward rejection
+            max_retries: Attempts per push before giving up
+            base_delay: Smallest retry delay in seconds
+            max_delay: Largest retry delay in seconds
+            coalesce_delay: Seconds to wait for further commits before pushing
+            max_failure_delay: Largest delay in seconds before a push that
+                gave up is tried again
+            on_failure: Coroutine function called when a push gives up
+            on_pushed: Called with the request-to-push latency in seconds
+                after each successful push
+        """
+        self._push = push
+        self._repull = repull
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.coalesce_delay = coalesce_delay
+        self.max_failure_delay = max_failure_delay
+        self._on_failure = on_failure
+        self._on_pushed = on_pushed
+        self.last_error: Optional[Exception] = None
+        self._stats = PushStats()
+        self._latencies: Deque[float] = deque(maxlen=1024)
+        self._requested_at: Optional[float] = None
+        self._pending_requests = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._give_ups = 0  # consecutive pushes that gave up
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+
+    def schedule(self) -> None:
+        """Request a push of all local commits; returns immediately."""
+        self._ensure_worker()
+        self._stats.requests += 1
+        self._pending_requests += 1
+        if self._requested_at is None:
+            self._requested_at = time.monotonic()
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Wait until every scheduled push has completed or given up."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self) -> None:
+        """Stop the background worker."""
+        self._cancel_retry()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> PushStats:
+        """
+        Get a snapshot of push counters.
+
+        Returns:
+            Counters and request-to-push latency percentiles in seconds
+        """
+        stats = PushStats(**vars(self._stats))
+        latencies = sorted(self._latencies)
+        if latencies:
+            stats.latency_p50 = latencies[len(latencies) // 2]
+            stats.latency_p95 = latencies[int(len(latencies) * 0.95)]
+            stats.latency_p99 = latencies[int(len(latencies) * 0.99)]
+        return stats
+
+    def _ensure_worker(self) -> None:
+        """Start the background worker on first use."""
+        if self._worker is None or self._worker.done():
+            self._wakeup = self._wakeup or asyncio.Event()
+            self._idle = self._idle or asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        """Push whenever requests are pending."""
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.coalesce_delay)
+            self._wakeup.clear()
+
+            requests = self._pending_requests
+            requested_at = self._requested_at
+            self._pending_requests = 0
+            self._requested_at = None
+            self._stats.coalesced += max(0, requests - 1)
+
+            try:
+                await self._push_with_retry()
+                self.last_error = None
+                self._give_ups = 0
+                self._cancel_retry()
+                latency = time.monotonic() - requested_at
+                self._latencies.append(latency)
+                if self._on_pushed is not None:
+                    self._on_pushed(latency)
+            except Exception as e:
+                self._stats.failures += 1
+                self.last_error = e
+                self._give_ups += 1
+                delay = min(self.max_failure_delay,
+                            self.max_delay * 2 ** (self._give_ups - 1))
+                logger.error(
+                    f"Push failed after {self.max_retries} attempts, "
+                    f"trying again in {delay:.0f}s: {e}"
+                )
+                self._cancel_retry()
+                self._retry_handle = asyncio.get_running_loop().call_later(
+                    delay, self._retry, requested_at
+                )
+                if self._on_failure is not None:
+                    await self._on_failure(e)
+
+            if not self._pending_requests:
+                self._idle.set()
+
+    def _retry(self, requested_at: float) -> None:
+        """
+        Request the push of commits left behind by a push that gave up.
+
+        Args:
+            requested_at: Monotonic time of the original request
+        """
+        self._retry_handle = None
+        self.schedule()
+        self._requested_at = min(self._requested_at, requested_at)
+
+    def _cancel_retry(self) -> None:
+        """Cancel a pending retry of a push that gave up."""
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+    async def _push_with_retry(self) -> None:
+        """
+        Push once, retrying transient failures and re-pulling on rejection.
+
+        Raises:
+            Exception: The last error once all attempts are used up
+        """
+        delay = self.base_delay
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self._stats.pushes += 1
+                await self._push()
+                return
+            except (GitCommandError, PushRejectedError, TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self._stats.retries += 1
+                if self._is_non_fast_forward(e):
+                    logger.info("Push rejected as non-fast-forward, pulling first")
+                    self._stats.repulls += 1
+                    await self._repull()
+                    continue
+
+                # Decorrelated jitter: random between the base delay and
+                # three times the previous delay, capped
+                delay = min(self.max_delay,
+                            random.uniform(self.base_delay, delay * 3))
+                logger.warning(
+                    f"Push attempt {attempt} failed, retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    def _is_non_fast_forward(self, error: Exception) -> bool:
+        """
+        Check whether a push failure needs a pull before retrying.
+
+        Args:
+            error: Exception raised by the push
+
+        Returns:
+            True if the remote has commits the push does not contain
+        """
+        if isinstance(error, PushRejectedError):
+            return True
+        message = str(error)
+        return any(marker in message for marker in self.NON_FAST_FORWARD_MARKERS)
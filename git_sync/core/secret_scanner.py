@@ -0,0 +1,383 @@
+"""
+Staged-diff secret scanner for MachinaForge commits.
+
+Reads every staged hunk from a single ``git diff --cached`` stream, checks
+added lines against all sensitive patterns at once through a combined
+regular expression, and only runs the individual patterns on lines the
+combined one flags. Results are cached by the blob SHAs of each diff, so
+content that was already scanned is skipped, and large change sets are
+scanned in parallel processes.
+
+Used by the pre-commit hook and by the sync engine before auto-commits::
+
+    python3 -m git_sync.core.secret_scanner [--repo PATH] [--credentials-only]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_QUOTED = r'''\s*=\s*["'][^"']*["']'''
+
+# Assignments of known credential variables
+CREDENTIAL_PATTERNS: Tuple[str, ...] = (
+    # Hetzner credentials
+    r'HCLOUD_TOKEN' + _QUOTED,
+    r'ROOT_PASSWORD' + _QUOTED,
+    # MCP API and security
+    r'MCP_API_KEY' + _QUOTED,
+    r'MCP_DB_PASSWORD' + _QUOTED,
+    r'SECRET_KEY' + _QUOTED,
+    # Database credentials
+    r'DB_PASSWORD' + _QUOTED,
+    r'MYSQL_PASSWORD' + _QUOTED,
+    r'MONGODB_URI' + _QUOTED,
+    # API tokens and keys
+    r'API[_\-]?TOKEN' + _QUOTED,
+    r'API[_\-]?KEY' + _QUOTED,
+    r'PRIVATE[_\-]?KEY' + _QUOTED,
+)
+
+# Shapes that often are secrets or personal data, but also match hashes,
+# versions and addresses in ordinary files
+GENERIC_PATTERNS: Tuple[str, ...] = (
+    r'[0-9a-fA-F]{32}',  # 32-char hex (like API keys)
+    r'[0-9a-zA-Z]{40}',  # 40-char alphanumeric (like tokens)
+    r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}',  # IP addresses
+    r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,63}',  # Email addresses
+)
+
+# Everything the pre-commit hook rejects
+SENSITIVE_PATTERNS = CREDENTIAL_PATTERNS + GENERIC_PATTERNS
+
+# Added lines of one file: (line number, text)
+AddedLines = List[Tuple[int, str]]
+
+@dataclass
+class Finding:
+    """An added line matching a sensitive pattern."""
+
+    path: str
+    line: int
+    pattern: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: matches pattern: {self.pattern}"
+
+class SensitiveDataError(Exception):
+    """Staged changes contain lines matching sensitive patterns."""
+
+    def __init__(self, findings: List[Finding]):
+        self.findings = findings
+        paths = sorted({finding.path for finding in findings})
+        super().__init__(
+            f"Potential sensitive data in {len(paths)} files: {', '.join(paths)}"
+        )
+
+@dataclass
+class _FileDiff:
+    """Added lines of one staged file."""
+
+    path: str
+    key: str  # old and new blob SHA
+    lines: AddedLines
+
+class SecretScanner:
+    """Scan staged changes for sensitive data."""
+
+    MAX_CACHE_ENTRIES = 50000
+    PARALLEL_THRESHOLD = 4 * 1024 * 1024  # bytes of added lines
+
+    def __init__(self,
+                 repo_path: Path,
+                 patterns: Sequence[str] = SENSITIVE_PATTERNS,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the scanner.
+
+        Args:
+            repo_path: Repository whose index is scanned
+            patterns: Regular expressions that flag an added line
+            max_workers: Processes used for large change sets, defaults to
+                the CPU count
+        """
+        self.repo_path = repo_path
+        self.patterns = tuple(patterns)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        digest = hashlib.sha256('\0'.join(self.patterns).encode()).hexdigest()[:16]
+        self.cache_path = self._git_dir() / 'machinaforge' / f'secret-scan-{digest}.json'
+        self._cache: Optional[Dict[str, List[Tuple[int, int]]]] = None
+
+    def scan_staged(self) -> List[Finding]:
+        """
+        Scan the lines added by the staged changes.
+
+        Returns:
+            Findings in path and line order, empty if the changes are clean
+        """
+        cache = self._load_cache()
+        findings: List[Finding] = []
+        pending: List[_FileDiff] = []
+        for diff in self._staged_diffs(cache):
+            cached = cache.get(diff.key)
+            if cached is not None:
+                findings.extend(self._findings(diff.path, cached))
+            else:
+                pending.append(diff)
+
+        if pending:
+            for diff, matches in zip(pending, self._scan(pending)):
+                cache[diff.key] = matches
+                findings.extend(self._findings(diff.path, matches))
+            self._save_cache(cache)
+        return findings
+
+    def check_staged(self) -> None:
+        """
+        Reject staged changes containing sensitive data.
+
+        Raises:
+            SensitiveDataError: If any added line matches a pattern
+        """
+        findings = self.scan_staged()
+        if findings:
+            for finding in findings:
+                logger.error(f"Potential sensitive data: {finding}")
+            raise SensitiveDataError(findings)
+
+    def _staged_diffs(self, cache: Dict) -> Iterator[_FileDiff]:
+        """
+        Parse the staged diff into added lines per file.
+
+        Lines of files whose blob pair is cached are not collected; binary
+        and deleted files are skipped.
+
+        Args:
+            cache: Scan results keyed by blob pair
+
+        Yields:
+            Added lines per text file
+        """
+        process = subprocess.Popen(
+            ['git', '-c', 'core.quotePath=false', 'diff', '--cached',
+             '--unified=0', '--no-color', '--no-ext-diff', '--no-renames',
+             '--full-index'],
+            cwd=str(self.repo_path),
+            stdout=subprocess.PIPE
+        )
+        current: Optional[_FileDiff] = None
+        key = ''
+        header = False
+        collect = False
+        line_number = 0
+        try:
+            for raw in process.stdout:
+                line = raw.decode('utf-8', errors='replace').rstrip('\n')
+                if line.startswith('diff --git '):
+                    if current is not None:
+                        yield current
+                    current, key, header, collect = None, '', True, False
+                elif line.startswith('@@ '):
+                    header = False
+                    match = re.match(r'@@ -\S+ \+(\d+)', line)
+                    line_number = int(match.group(1)) if match else 0
+                elif header:
+                    if line.startswith('index '):
+                        key = line.split()[1]
+                    elif line.startswith('+++ ') and line != '+++ /dev/null':
+                        current = _FileDiff(_unquote(line[4:])[2:], key, [])
+                        collect = key not in cache
+                elif line.startswith('+') and current is not None:
+                    if collect:
+                        current.lines.append((line_number, line[1:]))
+                    line_number += 1
+            if current is not None:
+                yield current
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, 'git diff --cached')
+
+    def _scan(self, diffs: List[_FileDiff]) -> List[List[Tuple[int, int]]]:
+        """
+        Scan files, in parallel processes when the change set is large.
+
+        Args:
+            diffs: Files to scan
+
+        Returns:
+            (line, pattern index) matches per file, in input order
+        """
+        size = sum(len(text) for diff in diffs for _, text in diff.lines)
+        if size < self.PARALLEL_THRESHOLD or len(diffs) < 2 or self.max_workers < 2:
+            return [_scan_lines(self.patterns, diff.lines) for diff in diffs]
+        # Forking copies locks held by the watcher and executor threads
+        context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+            else 'spawn'
+        )
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as pool:
+            return list(pool.map(
+                _scan_lines,
+                [self.patterns] * len(diffs),
+                [diff.lines for diff in diffs],
+                chunksize=max(1, len(diffs) // (self.max_workers * 4))
+            ))
+
+    def _findings(self, path: str, matches: List[Tuple[int, int]]) -> List[Finding]:
+        """
+        Turn cached matches into findings.
+
+        Args:
+            path: File the matches belong to
+            matches: (line, pattern index) tuples
+
+        Returns:
+            Findings for the file
+        """
+        return [Finding(path, line, self.patterns[index]) for line, index in matches]
+
+    def _git_dir(self) -> Path:
+        """
+        Locate the repository's git directory.
+
+        Returns:
+            Absolute path of the git directory
+        """
+        output = subprocess.run(
+            ['git', 'rev-parse', '--absolute-git-dir'],
+            cwd=str(self.repo_path), capture_output=True, text=True, check=True
+        )
+        return Path(output.stdout.strip())
+
+    def _load_cache(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Load scan results from earlier runs.
+
+        Returns:
+            Matches keyed by blob pair
+        """
+        if self._cache is None:
+            try:
+                self._cache = {
+                    key: [tuple(match) for match in matches]
+                    for key, matches in json.loads(self.cache_path.read_text()).items()
+                }
+            except (FileNotFoundError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self, cache: Dict[str, List[Tuple[int, int]]]) -> None:
+        """
+        Persist scan results, dropping the oldest beyond the size limit.
+
+        Args:
+            cache: Matches keyed by blob pair
+        """
+        excess = len(cache) - self.MAX_CACHE_ENTRIES
+        if excess > 0:
+            for key in list(cache)[:excess]:
+                del cache[key]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix('.tmp')
+            temp_path.write_text(json.dumps(cache))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save secret scan cache: {e}")
+
+@lru_cache(maxsize=8)
+def _compile(patterns: Tuple[str, ...]) -> Tuple[re.Pattern, List[re.Pattern]]:
+    """
+    Compile a pattern set into a combined prefilter and single patterns.
+
+    Args:
+        patterns: Regular expressions
+
+    Returns:
+        Tuple of (combined pattern, individual patterns)
+    """
+    combined = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+    return combined, [re.compile(pattern) for pattern in patterns]
+
+def _scan_lines(patterns: Tuple[str, ...], lines: AddedLines) -> List[Tuple[int, int]]:
+    """
+    Match added lines against a pattern set.
+
+    Module-level so it can run in worker processes.
+
+    Args:
+        patterns: Regular expressions
+        lines: (line number, text) tuples
+
+    Returns:
+        (line number, pattern index) for every matching pattern
+    """
+    combined, single = _compile(patterns)
+    matches = []
+    for line_number, text in lines:
+        if combined.search(text):
+            matches.extend(
+                (line_number, index)
+                for index, pattern in enumerate(single)
+                if pattern.search(text)
+            )
+    return matches
+
+def _unquote(path: str) -> str:
+    """
+    Decode a path git quoted because of special characters.
+
+    Args:
+        path: Path as printed by git
+
+    Returns:
+        Plain path
+    """
+    if not (path.startswith('"') and path.endswith('"')):
+        return path
+    return (path[1:-1].encode('latin-1', errors='backslashreplace')
+            .decode('unicode_escape')
+            .encode('latin-1')
+            .decode('utf-8', errors='replace'))
+
+def main() -> int:
+    """
+    Scan the staged changes of a repository and report findings.
+
+    Returns:
+        Exit status: 1 if sensitive data was found, 2 if the scan failed,
+        0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Scan staged changes for sensitive data")
+    parser.add_argument('--repo', type=Path, default=Path('.'),
+                        help="Repository to scan (default: current directory)")
+    parser.add_argument('--credentials-only', action='store_true',
+                        help="Skip generic patterns such as hex strings and emails")
+    args = parser.parse_args()
+
+    patterns = CREDENTIAL_PATTERNS if args.credentials_only else SENSITIVE_PATTERNS
+    try:
+        findings = SecretScanner(args.repo, patterns).scan_staged()
+    except Exception as e:
+        print(f"Secret scan failed: {e}", file=sys.stderr)
+        return 2
+    for finding in findings:
+        print(finding)
+    return 1 if findings else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Persistent sync state for the MachinaForge sync system.
+
+A small SQLite database under the log directory remembers, per repository,
+the last synced commits, when the working tree was last fully scanned and
+validated, a stat snapshot of the working tree and the fingerprints of
+generated documents. A restarted process loads it and continues
+incrementally instead of rescanning, re-pulling and re-rendering.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of a working tree file
+FileStat = Tuple[int, int]
+
+@dataclass
+class RepositoryState:
+    """Last known sync position of one repository."""
+
+    remote_sha: Optional[str] = None
+    head_sha: Optional[str] = None
+    last_full_scan: Optional[float] = None  # Unix timestamp
+    validated_at: Optional[float] = None  # Unix timestamp
+
+class StateStore:
+    """SQLite-backed store for sync state, shared by all repositories."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS repositories (
+            repository TEXT PRIMARY KEY,
+            remote_sha TEXT,
+            head_sha TEXT,
+            last_full_scan REAL,
+            validated_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS files (
+            repository TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (repository, path)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS documents (
+            repository TEXT NOT NULL,
+            document TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            PRIMARY KEY (repository, document)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open or create the state database.
+
+        Args:
+            path: Database file
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+
+    def load_repository(self, repository: str) -> RepositoryState:
+        """
+        Load the sync position of a repository.
+
+        Args:
+            repository: Repository name
+
+        Returns:
+            Stored state, empty if the repository was never synced
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT remote_sha, head_sha, last_full_scan, validated_at "
+                "FROM repositories WHERE repository = ?",
+                (repository,)
+            ).fetchone()
+        return RepositoryState(*row) if row else RepositoryState()
+
+    def save_repository(self, repository: str, state: RepositoryState) -> None:
+        """
+        Store the sync position of a repository.
+
+        Args:
+            repository: Repository name
+            state: State to store
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO repositories VALUES (?, ?, ?, ?, ?)",
+                (repository, state.remote_sha, state.head_sha,
+                 state.last_full_scan, state.validated_at)
+            )
+
+    def load_files(self, repository: str) -> Dict[str, FileStat]:
+        """
+        Load the working tree snapshot of a repository.
+
+        Args:
+            repository: Repository name
+
+        Returns:
+            (size, mtime_ns) keyed by repository-relative path
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE repository = ?",
+                (repository,)
+            ).fetchall()
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def replace_files(self, repository: str, files: Dict[str, FileStat]) -> None:
+        """
+        Replace the whole working tree snapshot of a repository.
+
+        Args:
+            repository: Repository name
+            files: (size, mtime_ns) keyed by repository-relative path
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files WHERE repository = ?", (repository,))
+            self._db.executemany(
+                "INSERT INTO files VALUES (?, ?, ?, ?)",
+                ((repository, path, size, mtime_ns)
+                 for path, (size, mtime_ns) in files.items())
+            )
+
+    def update_files(self,
+                     repository: str,
+                     files: Dict[str, Optional[FileStat]]) -> None:
+        """
+        Update part of the working tree snapshot of a repository.
+
+        Args:
+            repository: Repository name
+            files: (size, mtime_ns) keyed by path, None for deleted paths
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM files WHERE repository = ? AND path = ?",
+                ((repository, path) for path, stat in files.items() if stat is None)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                ((repository, path, stat[0], stat[1])
+                 for path, stat in files.items() if stat is not None)
+            )
+
+    def load_documents(self, repository: str) -> Dict[str, str]:
+        """
+        Load the render fingerprints of generated documents.
+
+        Args:
+            repository: Repository name
+
+        Returns:
+            Fingerprint keyed by document name
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT document, fingerprint FROM documents WHERE repository = ?",
+                (repository,)
+            ).fetchall()
+        return dict(rows)
+
+    def save_document(self, repository: str, document: str, fingerprint: str) -> None:
+        """
+        Store the render fingerprint of a generated document.
+
+        Args:
+            repository: Repository name
+            document: Document name
+            fingerprint: Fingerprint of the inputs of its last render
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                (repository, document, fingerprint)
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+_stores: Dict[Path, StateStore] = {}
+_stores_lock = threading.Lock()
+
+def get_state_store(path: Path) -> StateStore:
+    """
+    Get the process-wide store for a database file.
+
+    Args:
+        path: Database file
+
+    Returns:
+        Shared store instance
+    """
+    key = Path(path).resolve()
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = StateStore(key)
+        return _stores[key]
@@ -0,0 +1,117 @@
+"""
+Multi-repository sync supervision for the MachinaForge system.
+
+This module schedules sync cycles for many repositories from one process.
+Cycles run concurrently under a global limit, waiting repositories are served
+in arrival order, and each repository is isolated so a stuck remote or a
+failing cycle only delays that repository.
+"""
+
+import asyncio
+from typing import Any, List, Optional
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+class SyncSupervisor:
+    """Run sync cycles for many repositories with bounded concurrency."""
+
+    def __init__(self,
+                 workers: List[Any],
+                 max_concurrency: int = 3,
+                 cycle_timeout: Optional[float] = 600.0,
+                 max_backoff: float = 1800.0):
+        """
+        Initialize the supervisor.
+
+        Workers provide ``name``, ``async initialize()``,
+        ``async wait_for_trigger()`` and ``async run_cycle() -> bool``.
+
+        Args:
+            workers: Per-repository workers to supervise
+            max_concurrency: Maximum number of cycles running at once
+            cycle_timeout: Seconds before a cycle is abandoned, or None
+            max_backoff: Upper bound in seconds for retry delays
+        """
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.cycle_timeout = cycle_timeout
+        self.max_backoff = max_backoff
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def run(self) -> None:
+        """Supervise all workers until cancelled."""
+        # asyncio.Semaphore wakes waiters in FIFO order, which keeps
+        # scheduling fair between repositories competing for a slot
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        logger.info(
+            f"Supervising {len(self.workers)} repositories, "
+            f"{self.max_concurrency} at a time"
+        )
+        await asyncio.gather(*(self._supervise(w) for w in self.workers))
+
+    async def _supervise(self, worker: Any) -> None:
+        """
+        Initialize a worker and run its cycles forever.
+
+        Args:
+            worker: Worker to supervise
+        """
+        failures = 0
+        while not await self._guarded(worker, worker.initialize(), 'initialize'):
+            failures += 1
+            await asyncio.sleep(self._backoff(failures))
+
+        failures = 0
+        while True:
+            await worker.wait_for_trigger()
+            if await self._guarded(worker, worker.run_cycle(), 'sync cycle'):
+                failures = 0
+                continue
+            failures += 1
+            delay = self._backoff(failures)
+            logger.warning(
+                f"{worker.name}: {failures} consecutive failures, "
+                f"retrying in {delay:.0f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _guarded(self, worker: Any, step: Any, description: str) -> bool:
+        """
+        Run one worker step inside a concurrency slot with a timeout.
+
+        Args:
+            worker: Worker the step belongs to
+            step: Coroutine to run
+            description: Step name for logs
+
+        Returns:
+            True if the step completed and did not report failure
+        """
+        async with self._slots:
+            try:
+                result = await asyncio.wait_for(step, self.cycle_timeout)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"{worker.name}: {description} timed out after "
+                    f"{self.cycle_timeout}s"
+                )
+                return False
+            except Exception as e:
+                logger.error(f"{worker.name}: {description} failed: {e}")
+                return False
+        return result is not False
+
+    def _backoff(self, failures: int) -> float:
+        """
+        Compute a jittered exponential retry delay.
+
+        Args:
+            failures: Number of consecutive failures
+
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.max_backoff, 5.0 * 2 ** min(failures, 16))
+        return random.uniform(delay / 2, delay)
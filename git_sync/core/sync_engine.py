@@ -7,32 +7,109 @@ commit management and conflict resolution.
 """
 
 import asyncio
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 import aiohttp
 import git
 from git.exc import GitCommandError
 import logging
 
 from ..config.sync_config import SyncConfig
+from .commit_builder import CommitBuilder
 from .file_watcher import FileWatcher
+from .git_executor import GitExecutor
+from .github_client import GitHubClient, get_client
+from .metrics_store import MetricsStore, get_metrics_store
+from .push_queue import PushQueue, PushRejectedError
+from .secret_scanner import CREDENTIAL_PATTERNS, SecretScanner
+from .telemetry_compactor import DEFAULT_POLICIES, TelemetryCompactor, TelemetryPolicy
+from .tracing import CycleProfiler, Span, configure_tracer, get_tracer
+from .state_store import RepositoryState, StateStore, get_state_store
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class EngineStats:
+    """Counters describing sync engine activity."""
+
+    pulls: int = 0
+    pulls_skipped: int = 0  # remote tip unchanged since the last sync
+
 class GitHubSyncEngine:
     """Core engine for GitHub repository synchronization."""
 
-    def __init__(self, config: SyncConfig):
+    def __init__(self,
+                 config: SyncConfig,
+                 git_executor: Optional[GitExecutor] = None,
+                 github_client: Optional[GitHubClient] = None,
+                 state_store: Optional[StateStore] = None,
+                 metrics: Optional[MetricsStore] = None):
         """
         Initialize the GitHub synchronization engine.
 
         Args:
             config: Configuration object containing GitHub credentials and settings
+            git_executor: Executor for blocking git calls, may be shared
+                between engines
+            github_client: GitHub API client, defaults to the shared
+                client for the configured token and API URL
+            state_store: Store persisting sync state across restarts,
+                defaults to ``sync_state.db`` under the log directory
+            metrics: Store recording cycle metrics, defaults to
+                ``metrics.db`` under the log directory
         """
         self.config = config
         self.repo: Optional[git.Repo] = None
-        self.file_watcher = FileWatcher(self.config.repository_path)
+        self.commit_builder: Optional[CommitBuilder] = None
+        self.compactor: Optional[TelemetryCompactor] = None
+        self.git_executor = git_executor or GitExecutor(
+            default_timeout=config.operation_timeout
+        )
+        self.github_client = github_client or get_client(
+            config.github_token, config.github_api_url
+        )
+        self.file_watcher = FileWatcher(
+            self.config.repository_path,
+            self.config.ignore_patterns
+        )
+        self.state_store = state_store or get_state_store(
+            config.log_path / 'sync_state.db'
+        )
+        self.state = RepositoryState()
+        self.metrics = metrics or get_metrics_store(config.log_path / 'metrics.db')
+        self.last_changes: List[Tuple[str, str]] = []
+        self.stats = EngineStats()
+        self.push_queue = PushQueue(
+            self._push_changes,
+            self._pull_changes,
+            max_retries=config.push_retries,
+            on_failure=self._handle_push_failure,
+            on_pushed=lambda latency: self._record_metrics(
+                {'push_latency_seconds': latency}
+            )
+        )
+        # Remote branch tip as of our last successful pull or push
+        self._last_remote_sha: Optional[str] = None
+        self._last_full_scan: Optional[float] = None
+        # Working tree stats taken before this cycle's scan, saved once the
+        # cycle succeeds: a full snapshot or the scanned paths only
+        self._pending_snapshot: Optional[Dict[str, Any]] = None
+        self._pending_snapshot_full = False
+        if config.trace_path is not None:
+            configure_tracer(config.trace_path)
+        self.profiler: Optional[CycleProfiler] = None
+        if config.slow_cycle_threshold is not None:
+            self.profiler = CycleProfiler(
+                config.log_path / 'profiles',
+                config.slow_cycle_threshold,
+                config.profile_sample_rate
+            )
         self._setup_logging()
 
     async def initialize(self) -> None:
@@ -48,81 +125,490 @@ class GitHubSyncEngine:
         """
         try:
             self.repo = git.Repo(self.config.repository_path)
+            # Generic patterns (hashes, addresses) would block generated
+            # files, so auto-commits only reject credential assignments
+            self.commit_builder = CommitBuilder(
+                self.repo,
+                self.config.max_file_size,
+                scanner=SecretScanner(
+                    Path(self.repo.working_tree_dir), CREDENTIAL_PATTERNS
+                )
+            )
+            policies = self.config.telemetry_policies
+            self.compactor = TelemetryCompactor(
+                Path(self.repo.working_tree_dir),
+                DEFAULT_POLICIES if policies is None else
+                [TelemetryPolicy(**policy) for policy in policies],
+                read_committed=self._read_committed
+            )
+            self.state = self.state_store.load_repository(self.config.repository)
             await self._validate_github_connection()
             await self._setup_branch_tracking()
+            # Watch before restoring, so changes made while the saved
+            # snapshot is compared are not missed
             self.file_watcher.start_monitoring()
+            await self._restore_state()
+        except asyncio.CancelledError:
+            # The supervisor retries initialization after a timeout
+            self.file_watcher.stop_monitoring()
+            raise
         except Exception as e:
             logger.error(f"Failed to initialize sync engine: {e}")
+            self.file_watcher.stop_monitoring()
             raise
 
     async def sync(self) -> bool:
         """
         Perform a full synchronization cycle.
 
+        New commits are handed to the push queue, which pushes them in the
+        background; await ``push_queue.flush()`` to wait for the push.
+
+        Returns:
+            bool: True if sync was successful, False otherwise
+        """
+        profile = (self.profiler.profile(self.config.repository)
+                   if self.profiler is not None else nullcontext())
+        with profile, get_tracer().span('sync_cycle', 'engine',
+                                        repository=self.config.repository) as cycle:
+            ok = await self._sync_cycle(cycle)
+            cycle.set(ok=ok)
+        return ok
+
+    async def _sync_cycle(self, cycle: Span) -> bool:
+        """
+        Run the stages of a synchronization cycle.
+
+        Args:
+            cycle: Span of the cycle, receiving its change count
+
         Returns:
             bool: True if sync was successful, False otherwise
         """
+        self.last_changes = []
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
         try:
-            await self._pull_changes()
-            changes = await self._analyze_local_changes()
+            with self._timed(timings, 'pull') as span:
+                pulls, skipped = self.stats.pulls, self.stats.pulls_skipped
+                await self._pull_changes()
+                timings['pulls'] = self.stats.pulls - pulls
+                timings['pulls_skipped'] = self.stats.pulls_skipped - skipped
+                span.set(skipped=timings['pulls_skipped'] > 0)
+            with self._timed(timings, 'scan') as span:
+                changes = await self._analyze_local_changes()
+                span.set(files=len(changes), full=self._pending_snapshot_full)
             if changes:
-                await self._commit_changes(changes)
-                await self._push_changes()
+                with self._timed(timings, 'compact') as span:
+                    changes = await self._compact_telemetry(changes)
+                    span.set(files=len(changes))
+            if changes:
+                with self._timed(timings, 'commit', files=len(changes)):
+                    changes = await self._commit_changes(changes)
+            if changes:
+                self.push_queue.schedule()
+            self.last_changes = changes
+            cycle.set(changes=len(changes))
+            await self._save_state()
+            timings['sync_duration_seconds'] = time.perf_counter() - started
+            timings['changes_committed'] = len(changes)
+            self._record_metrics(timings)
             return True
+        except asyncio.CancelledError:
+            # A timed-out cycle is cancelled by the supervisor after its
+            # dirty paths were consumed
+            self.file_watcher.request_full_scan()
+            raise
         except Exception as e:
             logger.error(f"Sync failed: {e}")
+            # Paths consumed this cycle may not have been committed
+            self.file_watcher.request_full_scan()
+            timings['sync_failures'] = 1
+            self._record_metrics(timings)
             await self._handle_sync_failure(e)
             return False
 
+    @contextmanager
+    def _timed(self,
+               timings: Dict[str, float],
+               stage: str,
+               **attributes: Any) -> Iterator[Span]:
+        """
+        Time a cycle stage into a metrics dictionary and a tracing span.
+
+        Args:
+            timings: Dictionary receiving ``<stage>_duration_seconds``
+            stage: Stage name
+            **attributes: Initial span attributes
+
+        Yields:
+            The stage's span
+        """
+        start = time.perf_counter()
+        try:
+            with get_tracer().span(stage, 'engine', **attributes) as span:
+                yield span
+        finally:
+            timings[f"{stage}_duration_seconds"] = time.perf_counter() - start
+
+    def _record_metrics(self, samples: Dict[str, float]) -> None:
+        """
+        Record metric samples for this repository.
+
+        Args:
+            samples: Values keyed by metric name
+        """
+        try:
+            self.metrics.record_many([
+                (self.config.repository, name, value)
+                for name, value in samples.items()
+            ])
+        except Exception as e:
+            logger.warning(f"Could not record metrics: {e}")
+
     async def _pull_changes(self) -> None:
         """
         Pull latest changes from remote repository.
 
+        Skipped entirely when the remote branch tip has not moved since the
+        last successful pull or push.
+
         Handles merge conflicts through intelligent resolution strategies.
         """
+        remote_sha = await self._get_remote_head()
+        if remote_sha is not None and remote_sha == self._last_remote_sha:
+            self.stats.pulls_skipped += 1
+            logger.debug(f"Remote {self.config.branch} unchanged, skipping pull")
+            return
+
+        self.stats.pulls += 1
         try:
-            self.repo.remote().pull(self.config.branch)
+            # Merge explicitly; newer git refuses divergent pulls otherwise
+            await self._run_git(
+                'pull',
+                self.repo.remote().pull,
+                self.config.branch,
+                no_rebase=True,
+                kill_after_timeout=self.config.operation_timeout
+            )
         except GitCommandError as e:
             if "CONFLICT" in str(e):
                 await self._resolve_conflicts()
             else:
                 raise
+        self._last_remote_sha = remote_sha
+
+    async def _get_remote_head(self) -> Optional[str]:
+        """
+        Look up the remote branch tip without fetching objects.
+
+        GitHub-hosted remotes are checked through the refs API, where
+        unchanged refs cost a free conditional request. Other remotes, or
+        API failures, fall back to ``git ls-remote``.
+
+        Returns:
+            SHA of the remote branch tip, or None if it cannot be determined
+        """
+        branch = self.config.branch
+        if self._is_github_remote(self.repo.remote().url):
+            try:
+                status, data = await self.github_client.get(
+                    f"/repos/{self.config.repository}/git/ref/heads/{branch}"
+                )
+                if status == 200 and isinstance(data, dict):
+                    return data['object']['sha']
+            except (aiohttp.ClientError, asyncio.TimeoutError, KeyError) as e:
+                logger.debug(f"GitHub ref lookup failed, using ls-remote: {e}")
+
+        try:
+            output = await self._run_git(
+                'ls-remote',
+                self.repo.git.ls_remote,
+                self.repo.remote().name,
+                f"refs/heads/{branch}",
+                kill_after_timeout=self.config.operation_timeout
+            )
+        except GitCommandError as e:
+            logger.warning(f"Could not check remote head: {e}")
+            return None
+        return output.split()[0] if output else None
+
+    def _is_github_remote(self, url: str) -> bool:
+        """
+        Check whether a remote URL points at the configured repository on
+        the GitHub host served by ``github_api_url``.
+
+        Args:
+            url: Remote URL, including scp-style ``git@host:owner/repo``
+
+        Returns:
+            True if the refs API can stand in for ``git ls-remote``
+        """
+        host, path = _split_remote_url(url)
+        api_host = urlsplit(self.config.github_api_url).hostname or ''
+        # github.com serves its API from api.github.com, Enterprise from /api/v3
+        expected = 'github.com' if api_host == 'api.github.com' else api_host
+        path = path.strip('/')
+        if path.endswith('.git'):
+            path = path[:-len('.git')]
+        return (host is not None and host.lower() == expected.lower()
+                and path.lower() == self.config.repository.lower())
 
     async def _analyze_local_changes(self) -> List[Tuple[str, str]]:
         """
         Analyze local changes and prepare them for commit.
 
+        Only paths reported dirty by the file watcher are diffed. The whole
+        working tree is diffed on startup, after a watcher overflow and every
+        ``reconcile_interval`` seconds to catch missed events.
+
         Returns:
             List of tuples containing (file_path, change_type)
         """
-        changes = []
-        for item in self.repo.index.diff(None):
-            changes.append((item.a_path, item.change_type))
+        dirty = self.file_watcher.consume_dirty_paths()
+        now = time.monotonic()
+        # Stats are taken before scanning, so an edit racing the scan is
+        # seen as a change after a restart rather than lost
+        if (dirty is None or self._last_full_scan is None or
+                now - self._last_full_scan >= self.config.reconcile_interval):
+            self._pending_snapshot = await asyncio.to_thread(
+                self.file_watcher.snapshot_tree
+            )
+            self._pending_snapshot_full = True
+            changes = await self._run_git('diff', self._scan_working_tree)
+            self._last_full_scan = now
+        elif dirty:
+            self._pending_snapshot = self.file_watcher.snapshot_paths(dirty)
+            self._pending_snapshot_full = False
+            changes = await self._run_git(
+                'diff', self._scan_working_tree, sorted(dirty)
+            )
+        else:
+            return []
         return changes
 
-    async def _commit_changes(self, changes: List[Tuple[str, str]]) -> None:
+    async def _compact_telemetry(self,
+                                 changes: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Apply telemetry policies to the changes about to be committed.
+
+        Held paths are offered again next cycle and left out of the saved
+        snapshot, so a restart still finds them changed.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+
+        Returns:
+            Changes to commit this cycle
+        """
+        result = await self._run_git('compact', self.compactor.compact, changes)
+        self._hold_paths(result.held)
+        self._record_metrics({
+            'telemetry_paths_held': len(result.held),
+            'telemetry_paths_squashed': len(result.squashed),
+            'telemetry_samples_rolled_up': result.samples,
+        })
+        return result.changes
+
+    def _hold_paths(self, paths: List[str]) -> None:
+        """
+        Leave changed paths uncommitted until a later cycle.
+
+        Held paths are offered again next cycle and left out of the saved
+        snapshot, so a restart still finds them changed.
+
+        Args:
+            paths: Repository-relative paths
+        """
+        if paths:
+            self.file_watcher.requeue_dirty_paths(paths)
+            if self._pending_snapshot is not None:
+                for path in paths:
+                    self._pending_snapshot.pop(path, None)
+
+    def _read_committed(self, path: str) -> Optional[bytes]:
+        """
+        Read a file as committed at HEAD.
+
+        Blocking; called by the compactor inside the git executor.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            File content, or None if HEAD does not contain the file
+        """
+        try:
+            return (self.repo.head.commit.tree / path).data_stream.read()
+        except (KeyError, ValueError):
+            return None
+
+    async def _restore_state(self) -> None:
+        """
+        Resume from the state saved by an earlier run.
+
+        When HEAD is where the last run left it, the working tree is
+        compared against the saved stat snapshot and only the differing
+        paths are scanned, and the next full reconcile keeps its original
+        schedule. Otherwise the first cycle scans the whole tree.
+        """
+        state = self.state
+        self._last_remote_sha = state.remote_sha
+        if (state.head_sha is None or state.last_full_scan is None or
+                state.head_sha != self.repo.head.commit.hexsha):
+            return
+
+        saved = self.state_store.load_files(self.config.repository)
+        if not saved:
+            return
+        current = await asyncio.to_thread(self.file_watcher.snapshot_tree)
+        changed = {path for path, stat in current.items() if saved.get(path) != stat}
+        changed.update(path for path in saved if path not in current)
+        self.file_watcher.seed_dirty_paths(changed)
+
+        age = max(0.0, time.time() - state.last_full_scan)
+        self._last_full_scan = time.monotonic() - age
+        logger.info(
+            f"Restored sync state for {self.config.repository}: "
+            f"{len(changed)} paths changed since last run"
+        )
+
+    async def _save_state(self) -> None:
+        """Persist the sync position reached by a successful cycle."""
+        snapshot = self._pending_snapshot
+        self._pending_snapshot = None
+        try:
+            if snapshot is not None:
+                if self._pending_snapshot_full:
+                    self.state.last_full_scan = time.time()
+                    await asyncio.to_thread(
+                        self.state_store.replace_files,
+                        self.config.repository, snapshot
+                    )
+                else:
+                    await asyncio.to_thread(
+                        self.state_store.update_files,
+                        self.config.repository, snapshot
+                    )
+            self._save_position()
+        except Exception as e:
+            # Losing the snapshot only costs a full scan after a restart
+            logger.warning(f"Could not save sync state: {e}")
+
+    def _save_position(self) -> None:
+        """Persist the local and remote commits last synced."""
+        self.state.head_sha = self.repo.head.commit.hexsha
+        self.state.remote_sha = self._last_remote_sha
+        self.state_store.save_repository(self.config.repository, self.state)
+
+    def _scan_working_tree(self,
+                           paths: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """
+        List modified tracked files and new untracked files.
+
+        Blocking; run it through the git executor.
+
+        Args:
+            paths: Paths to limit the scan to, or None for the whole tree
+
+        Returns:
+            List of tuples containing (file_path, change_type)
+        """
+        pathspec = {'paths': paths} if paths else {}
+        changes = [
+            (item.a_path, item.change_type)
+            for item in self.repo.index.diff(None, **pathspec)
+        ]
+        untracked = self.repo.git.ls_files(
+            '--others', '--exclude-standard', '-z', '--', *(paths or [])
+        )
+        changes.extend((path, 'A') for path in untracked.split('\0') if path)
+        return changes
+
+    async def _commit_changes(self,
+                              changes: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
         """
         Commit local changes with intelligent commit message generation.
 
+        Files whose added lines contain credentials are held back and
+        reported every cycle until they are fixed; the rest is committed.
+
         Args:
             changes: List of changes to commit
+
+        Returns:
+            Changes committed
         """
         message = await self._generate_commit_message(changes)
-        self.repo.index.add([change[0] for change in changes])
-        self.repo.index.commit(message)
+        result = await self._run_git('commit', self.commit_builder.commit, changes, message)
+        self._record_metrics({'secret_scan_paths_held': len(result.held)})
+        if result.held:
+            logger.error(
+                f"Not committing {len(result.held)} files with potential "
+                f"sensitive data: {', '.join(result.held)}"
+            )
+            self._hold_paths(result.held)
+        if result.commit is None:
+            return []
+        held = set(result.held)
+        return [change for change in changes if change[0] not in held]
 
     async def _push_changes(self) -> None:
-        """Push local commits to remote repository with retry mechanism."""
-        retries = self.config.push_retries
-        while retries > 0:
-            try:
-                self.repo.remote().push(self.config.branch)
-                break
-            except GitCommandError as e:
-                retries -= 1
-                if retries == 0:
-                    raise
-                await asyncio.sleep(2 ** (self.config.push_retries - retries))
+        """
+        Push local commits to the remote repository once.
+
+        Called by the push queue, which handles retries and coalescing.
+
+        Raises:
+            PushRejectedError: If the remote is ahead and a pull is needed
+            GitCommandError: If the push fails for any other reason
+        """
+        head = self.repo.head.commit.hexsha
+        timings: Dict[str, float] = {}
+        with self._timed(timings, 'push'):
+            results = await self._run_git(
+                'push',
+                self.repo.remote().push,
+                self.config.branch,
+                kill_after_timeout=self.config.operation_timeout
+            )
+        self._record_metrics(timings)
+        for info in results:
+            if info.flags & info.REJECTED:
+                raise PushRejectedError(info.summary.strip())
+            if info.flags & (info.REMOTE_REJECTED | info.ERROR):
+                raise GitCommandError('push', 1, info.summary.strip())
+        self._last_remote_sha = head
+        try:
+            self._save_position()
+        except Exception as e:
+            logger.warning(f"Could not save sync state: {e}")
+
+    async def _run_git(self,
+                       operation: str,
+                       func: Callable[..., Any],
+                       *args: Any,
+                       **kwargs: Any) -> Any:
+        """
+        Run a blocking git call through the git executor.
+
+        Args:
+            operation: Operation name for logs and timeout errors
+            func: Blocking GitPython callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+        """
+        return await self.git_executor.run(
+            str(self.config.repository_path),
+            func,
+            *args,
+            operation=operation,
+            timeout=self.config.operation_timeout,
+            **kwargs
+        )
 
     async def _resolve_conflicts(self) -> None:
         """
@@ -148,18 +634,18 @@ class GitHubSyncEngine:
         return f"Update {len(changes)} files\n\nAutomatic commit by MachinaForge"
 
     async def _validate_github_connection(self) -> None:
-        """Validate GitHub credentials and API access."""
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Authorization": f"token {self.config.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            async with session.get(
-                f"https://api.github.com/repos/{self.config.repository}",
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    raise ConnectionError("Failed to validate GitHub credentials")
+        """
+        Validate GitHub credentials and API access.
+
+        A validation saved by an earlier run is reused while it is younger
+        than the client's validation TTL.
+        """
+        validated_at = self.state.validated_at
+        if (validated_at is not None and
+                time.time() - validated_at < self.github_client.validation_ttl):
+            return
+        await self.github_client.validate_repository(self.config.repository)
+        self.state.validated_at = time.time()
 
     async def _setup_branch_tracking(self) -> None:
         """Configure branch tracking and ensure proper remote setup."""
@@ -183,6 +669,16 @@ class GitHubSyncEngine:
         # TODO: Implement advanced error recovery strategies
         await self._notify_sync_failure(error)
 
+    async def _handle_push_failure(self, error: Exception) -> None:
+        """
+        Handle a push the push queue gave up on.
+
+        Args:
+            error: The exception raised by the last attempt
+        """
+        self._record_metrics({'push_failures': 1})
+        await self._handle_sync_failure(error)
+
     async def _notify_sync_failure(self, error: Exception) -> None:
         """
         Notify relevant parties of synchronization failures.
@@ -195,9 +691,12 @@ class GitHubSyncEngine:
 
     def _setup_logging(self) -> None:
         """Configure logging for the sync engine."""
-        handler = logging.FileHandler(
-            self.config.log_path / "sync_engine.log"
-        )
+        # Engines for several repositories may share one log file
+        log_file = str((self.config.log_path / "sync_engine.log").resolve())
+        if any(getattr(h, 'baseFilename', None) == log_file
+               for h in logger.handlers):
+            return
+        handler = logging.FileHandler(log_file)
         handler.setFormatter(
             logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -211,3 +710,18 @@ class GitHubSyncEngine:
         if hasattr(self, 'file_watcher'):
             self.file_watcher.stop_monitoring()
 
+def _split_remote_url(url: str) -> Tuple[Optional[str], str]:
+    """
+    Split a git remote URL into host and path.
+
+    Args:
+        url: Remote URL or scp-style ``[user@]host:path``
+
+    Returns:
+        Host, or None for local paths, and repository path
+    """
+    if '://' not in url:
+        match = re.match(r'^(?:[^@/]+@)?([^:/]+):(?!/)(.*)$', url)
+        return (match.group(1), match.group(2)) if match else (None, url)
+    parts = urlsplit(url)
+    return parts.hostname, parts.path
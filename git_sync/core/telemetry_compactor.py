@@ -0,0 +1,304 @@
+"""
+Telemetry compaction for the MachinaForge sync engine.
+
+Agents rewrite small JSON telemetry files under System/ every few minutes.
+Committing each rewrite bloats history and slows every pull and push, so
+the engine passes its changes through this stage before committing. Each
+telemetry path follows the first policy matching it:
+
+- ``rollup``: every new sample is appended in compact form to a JSON Lines
+  file next to it, and the file and its rollup are committed together once
+  ``samples`` samples were collected or ``interval`` seconds have passed
+- ``squash``: a snapshot differing from HEAD only in timestamp fields is
+  not committed
+- ``defer``: changes are held and committed together every ``interval``
+  seconds
+
+Held paths stay modified in the working tree and are offered again in a
+later cycle.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from .ignore_matcher import IgnoreMatcher
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_SUFFIX = '.samples.jsonl'
+
+@dataclass
+class TelemetryPolicy:
+    """How changes to matching paths are committed."""
+
+    pattern: str  # gitignore-style pattern
+    action: str  # 'rollup', 'squash' or 'defer'
+    samples: int = 12  # rollup: samples per commit
+    interval: float = 900.0  # rollup, defer: longest a change is held, in seconds
+    timestamp_keys: Tuple[str, ...] = (
+        'timestamp', 'last_updated', 'updated_at', 'generated_at', 'last_check'
+    )  # squash: fields ignored when comparing with HEAD
+
+    def __post_init__(self):
+        if self.action not in ('rollup', 'squash', 'defer'):
+            raise ValueError(f"Unknown telemetry action: {self.action}")
+        self.timestamp_keys = tuple(self.timestamp_keys)
+
+DEFAULT_POLICIES: Tuple[TelemetryPolicy, ...] = (
+    TelemetryPolicy('System/Metrics/trends/**/*.json', 'rollup'),
+    TelemetryPolicy('System/Trends/hourly/**/*.json', 'rollup'),
+    TelemetryPolicy('System/MCP/cache/*.json', 'squash'),
+    TelemetryPolicy('System/Logs/*.log', 'defer'),
+)
+
+@dataclass
+class CompactionResult:
+    """Changes left to commit after compaction."""
+
+    changes: List[Tuple[str, str]] = field(default_factory=list)
+    held: List[str] = field(default_factory=list)  # to offer again later
+    squashed: List[str] = field(default_factory=list)  # timestamp-only changes
+    samples: int = 0  # samples appended to rollups
+
+class TelemetryCompactor:
+    """Filter and compact telemetry changes before they are committed."""
+
+    def __init__(self,
+                 repo_path: Path,
+                 policies: Iterable[TelemetryPolicy] = DEFAULT_POLICIES,
+                 read_committed: Optional[Callable[[str], Optional[bytes]]] = None):
+        """
+        Initialize the compactor.
+
+        Args:
+            repo_path: Repository working tree
+            policies: Policies in priority order, first match wins
+            read_committed: Returns a path's content at HEAD, or None if it
+                is not committed; required by squash policies
+        """
+        self.repo_path = Path(repo_path)
+        self.policies = list(policies)
+        self.read_committed = read_committed
+        self._matchers = [IgnoreMatcher([policy.pattern]) for policy in self.policies]
+        # rollup path -> samples appended since its last commit
+        self._pending_samples: Dict[str, int] = {}
+        # path (rollup) or policy index (defer) -> monotonic time first held
+        self._held_since: Dict[Any, float] = {}
+
+    def policy_for(self, path: str) -> Optional[TelemetryPolicy]:
+        """
+        Find the policy governing a path.
+
+        Rollup files follow the policy of the file they collect.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            First matching policy, or None for ordinary files
+        """
+        index = self._policy_index(_source_path(path))
+        return None if index is None else self.policies[index]
+
+    def compact(self,
+                changes: List[Tuple[str, str]],
+                now: Optional[float] = None) -> CompactionResult:
+        """
+        Apply telemetry policies to a cycle's changes.
+
+        Blocking; reads files and, for squash policies, committed blobs.
+
+        Args:
+            changes: List of (file_path, change_type) tuples
+            now: Monotonic time, defaults to now
+
+        Returns:
+            Changes to commit and paths held for a later cycle
+        """
+        now = time.monotonic() if now is None else now
+        result = CompactionResult()
+        rollups: Dict[str, str] = {}  # source path -> change type
+        deferred: Dict[int, List[Tuple[str, str]]] = {}
+
+        for path, change_type in changes:
+            source = _source_path(path)
+            index = self._policy_index(source)
+            if index is None:
+                result.changes.append((path, change_type))
+                continue
+            action = self.policies[index].action
+            if action == 'rollup':
+                if source == path or source not in rollups:
+                    rollups[source] = change_type if source == path else 'M'
+            elif action == 'squash':
+                if change_type == 'M' and self._timestamps_only(path, self.policies[index]):
+                    result.squashed.append(path)
+                else:
+                    result.changes.append((path, change_type))
+            else:
+                deferred.setdefault(index, []).append((path, change_type))
+
+        for source, change_type in rollups.items():
+            self._rollup(source, change_type, self.policies[self._policy_index(source)],
+                         now, result)
+
+        for index, held in deferred.items():
+            since = self._held_since.setdefault(index, now)
+            if now - since >= self.policies[index].interval:
+                result.changes.extend(held)
+                del self._held_since[index]
+            else:
+                result.held.extend(path for path, _ in held)
+
+        if result.held or result.squashed or result.samples:
+            logger.debug(
+                f"Telemetry compaction: {len(result.held)} held, "
+                f"{len(result.squashed)} squashed, {result.samples} samples rolled up"
+            )
+        return result
+
+    def _rollup(self,
+                source: str,
+                change_type: str,
+                policy: TelemetryPolicy,
+                now: float,
+                result: CompactionResult) -> None:
+        """
+        Append a sample of a telemetry file to its rollup and decide
+        whether both are committed now.
+
+        Args:
+            source: Telemetry file
+            change_type: Change type reported for it
+            policy: Rollup policy of the file
+            now: Monotonic time
+            result: Result to add the outcome to
+        """
+        rollup = source + ROLLUP_SUFFIX
+        try:
+            sample = json.loads((self.repo_path / source).read_bytes())
+        except FileNotFoundError:
+            # Deleted telemetry is committed right away, with its rollup
+            result.changes.append((source, change_type))
+            if (self.repo_path / rollup).exists():
+                result.changes.append((rollup, 'M'))
+            self._pending_samples.pop(source, None)
+            self._held_since.pop(source, None)
+            return
+        except ValueError:
+            # Partially written; sampled once the writer finishes
+            result.held.append(source)
+            return
+
+        line = json.dumps(sample, separators=(',', ':'), sort_keys=True)
+        if line != _last_line(self.repo_path / rollup):
+            with open(self.repo_path / rollup, 'a') as f:
+                f.write(line + '\n')
+            self._pending_samples[source] = self._pending_samples.get(source, 0) + 1
+            result.samples += 1
+
+        since = self._held_since.setdefault(source, now)
+        if (self._pending_samples.get(source, 0) >= policy.samples
+                or now - since >= policy.interval):
+            result.changes.append((source, change_type))
+            result.changes.append((rollup, 'M'))
+            self._pending_samples.pop(source, None)
+            del self._held_since[source]
+        else:
+            result.held.extend((source, rollup))
+
+    def _timestamps_only(self, path: str, policy: TelemetryPolicy) -> bool:
+        """
+        Check whether a JSON snapshot differs from HEAD only in timestamps.
+
+        Args:
+            path: Modified snapshot
+            policy: Squash policy naming the timestamp fields
+
+        Returns:
+            True if the change can be skipped
+        """
+        if self.read_committed is None:
+            return False
+        try:
+            committed = self.read_committed(path)
+            if committed is None:
+                return False
+            current = (self.repo_path / path).read_bytes()
+            return (_without_keys(json.loads(committed), policy.timestamp_keys) ==
+                    _without_keys(json.loads(current), policy.timestamp_keys))
+        except (OSError, ValueError):
+            return False
+
+    def _policy_index(self, path: str) -> Optional[int]:
+        """
+        Find the index of the first policy matching a path.
+
+        Args:
+            path: Repository-relative path
+
+        Returns:
+            Policy index, or None if no policy matches
+        """
+        for index, matcher in enumerate(self._matchers):
+            if matcher.is_ignored(path):
+                return index
+        return None
+
+def _source_path(path: str) -> str:
+    """
+    Map a rollup file to the telemetry file it collects.
+
+    Args:
+        path: Repository-relative path
+
+    Returns:
+        The collected file for rollups, the path itself otherwise
+    """
+    return path[:-len(ROLLUP_SUFFIX)] if path.endswith(ROLLUP_SUFFIX) else path
+
+def _last_line(path: Path) -> Optional[str]:
+    """
+    Read the last line of a file without reading all of it.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Last line without its newline, or None if the file is missing or empty
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            block = 4096
+            while True:
+                start = max(0, size - block)
+                f.seek(start)
+                data = f.read(size - start).rstrip(b'\n')
+                newline = data.rfind(b'\n')
+                if newline >= 0 or start == 0:
+                    return data[newline + 1:].decode('utf-8', errors='replace') or None
+                block *= 2
+    except FileNotFoundError:
+        return None
+
+def _without_keys(value: Any, keys: Tuple[str, ...]) -> Any:
+    """
+    Remove fields from a JSON value recursively.
+
+    Args:
+        value: Parsed JSON
+        keys: Field names to remove
+
+    Returns:
+        Copy of the value without those fields
+    """
+    if isinstance(value, dict):
+        return {k: _without_keys(v, keys) for k, v in value.items() if k not in keys}
+    if isinstance(value, list):
+        return [_without_keys(v, keys) for v in value]
+    return value
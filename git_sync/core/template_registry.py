@@ -0,0 +1,118 @@
+"""
+Shared Jinja template registry for the MachinaForge documentation system.
+
+One environment is kept per template directory and shared by every
+DocumentationManager in the process. Compiled templates are held in memory
+and only reloaded when their ``.j2`` file's mtime changes, and the compiled
+bytecode is cached on disk so a fresh process skips compilation. Templates
+can be precompiled ahead of time, e.g. at install::
+
+    python3 -m git_sync.core.template_registry [TEMPLATE_DIR]
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+logger = logging.getLogger(__name__)
+
+class TemplateRegistry:
+    """Cached, bytecode-backed templates for one template directory."""
+
+    TEMPLATE_EXTENSIONS = ('j2',)
+
+    def __init__(self, template_path: Path, cache_dir: Optional[Path] = None):
+        """
+        Initialize the template registry.
+
+        Args:
+            template_path: Directory holding the templates
+            cache_dir: Directory for compiled bytecode; defaults to
+                ``__pycache__`` inside the template directory, or the
+                system temporary directory when that is not writable
+        """
+        self.template_path = template_path
+        self.cache_dir = cache_dir or self._default_cache_dir(template_path)
+        self.env = Environment(
+            loader=FileSystemLoader(str(template_path)),
+            bytecode_cache=FileSystemBytecodeCache(
+                str(self.cache_dir) if self.cache_dir else None
+            ),
+            # Loaded templates are re-checked against the source mtime
+            # and recompiled only when it changed
+            auto_reload=True,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+
+    def get_template(self, name: str) -> Template:
+        """
+        Get a compiled template.
+
+        Args:
+            name: Template file name relative to the template directory
+
+        Returns:
+            Compiled template
+        """
+        return self.env.get_template(name)
+
+    def precompile(self) -> int:
+        """
+        Compile every template into the bytecode cache.
+
+        Returns:
+            Number of templates compiled
+        """
+        names = self.env.list_templates(extensions=self.TEMPLATE_EXTENSIONS)
+        for name in names:
+            self.env.get_template(name)
+        logger.info(f"Precompiled {len(names)} templates from {self.template_path}")
+        return len(names)
+
+    def _default_cache_dir(self, template_path: Path) -> Optional[Path]:
+        """
+        Choose the bytecode cache directory.
+
+        Args:
+            template_path: Directory holding the templates
+
+        Returns:
+            Cache directory, or None to use the system temporary directory
+        """
+        cache_dir = template_path / '__pycache__'
+        try:
+            cache_dir.mkdir(exist_ok=True)
+        except OSError:
+            return None
+        return cache_dir if os.access(cache_dir, os.W_OK) else None
+
+_registries: Dict[Path, TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+def get_registry(template_path: Path) -> TemplateRegistry:
+    """
+    Get the process-wide registry for a template directory.
+
+    Args:
+        template_path: Directory holding the templates
+
+    Returns:
+        Shared registry instance
+    """
+    key = Path(template_path).resolve()
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = TemplateRegistry(key)
+        return _registries[key]
+
+if __name__ == '__main__':
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    default_path = Path(__file__).resolve().parents[1] / 'templates'
+    get_registry(Path(sys.argv[1]) if len(sys.argv) > 1 else default_path).precompile()
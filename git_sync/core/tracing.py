@@ -0,0 +1,394 @@
+"""
+Tracing spans and slow-cycle profiling for the MachinaForge sync system.
+
+Spans record monotonic start and end times plus attributes such as file
+counts and bytes. They are appended as Chrome trace events, one per line,
+to a local trace file that chrome://tracing and Perfetto open directly.
+Concurrent asyncio tasks and threads get separate tracks, so overlapping
+stages render side by side.
+
+Tracing is off until ``configure_tracer`` is called; disabled spans cost a
+generator step and nothing is written.
+
+CycleProfiler profiles a sample of sync cycles, and the cycles following a
+slow one, with cProfile and tracemalloc, keeping results only for cycles
+slower than a threshold. cProfile covers the blocking calls a cycle hands to
+the git executor, where its pull, scan, compaction and commit work runs;
+coroutine code on the event loop is not profiled, as the loop also runs
+other repositories' cycles. tracemalloc is process-wide, so allocation
+reports include everything running during the cycle.
+"""
+
+import asyncio
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """A timed operation with attributes."""
+
+    __slots__ = ('name', 'category', 'attributes')
+
+    def __init__(self, name: str, category: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Add or replace attributes.
+
+        Args:
+            **attributes: JSON-serializable values
+        """
+        self.attributes.update(attributes)
+
+class _NullSpan(Span):
+    """Span handed out while tracing is disabled."""
+
+    def __init__(self):
+        super().__init__('', '', {})
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """Writer of Chrome trace events to a local file."""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = 50 * 2**20):
+        """
+        Initialize the tracer.
+
+        Args:
+            path: Trace file, or None to disable tracing
+            max_bytes: Size after which the file is rotated to ``<path>.1``
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = path is not None
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = os.getpid()
+        self._tracks: Dict[Tuple[str, int], int] = {}
+        self._track_ids = itertools.count(1)
+        if self.enabled:
+            self._open()
+
+    @contextmanager
+    def span(self, name: str, category: str = 'sync', **attributes: Any) -> Iterator[Span]:
+        """
+        Record a span around a block.
+
+        Exceptions raised in the block are recorded as an ``error``
+        attribute and re-raised.
+
+        Args:
+            name: Span name
+            category: Component, e.g. ``engine`` or ``docs``
+            **attributes: Initial attributes
+
+        Yields:
+            The span, for attributes known only at the end
+        """
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        span = Span(name, category, attributes)
+        track = self._track()
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            self._write({
+                'name': name, 'cat': category, 'ph': 'X',
+                'ts': start / 1000, 'dur': (end - start) / 1000,
+                'pid': self._pid, 'tid': track, 'args': span.attributes,
+            })
+
+    def instant(self, name: str, category: str = 'sync', **attributes: Any) -> None:
+        """
+        Record a point in time, e.g. a profile being saved.
+
+        Args:
+            name: Event name
+            category: Component
+            **attributes: Event attributes
+        """
+        if self.enabled:
+            self._write({
+                'name': name, 'cat': category, 'ph': 'i', 's': 't',
+                'ts': time.perf_counter_ns() / 1000,
+                'pid': self._pid, 'tid': self._track(), 'args': attributes,
+            })
+
+    def close(self) -> None:
+        """Close the trace file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.enabled = False
+
+    def _track(self) -> int:
+        """
+        Get the track of the current asyncio task or thread.
+
+        Returns:
+            Chrome trace thread id
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = ('task', id(task)) if task is not None else ('thread', threading.get_ident())
+        track = self._tracks.get(key)
+        if track is None:
+            with self._lock:
+                track = self._tracks.get(key)
+                if track is None:
+                    if len(self._tracks) > 10000:
+                        self._tracks.clear()
+                    track = self._tracks[key] = next(self._track_ids)
+                    label = task.get_name() if task is not None else threading.current_thread().name
+                    self._write_locked({
+                        'name': 'thread_name', 'ph': 'M', 'pid': self._pid,
+                        'tid': track, 'args': {'name': label},
+                    })
+        return track
+
+    def _open(self) -> None:
+        """Open the trace file, starting the event array if it is new."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() == 0:
+            # The closing bracket is optional for Chrome trace viewers
+            self._file.write('[\n')
+            self._file.flush()
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        """
+        Append an event.
+
+        Args:
+            event: Chrome trace event
+        """
+        with self._lock:
+            self._write_locked(event)
+
+    def _write_locked(self, event: Dict[str, Any]) -> None:
+        """
+        Append an event with the lock held, rotating a full file.
+
+        Args:
+            event: Chrome trace event
+        """
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps(event, default=str, separators=(',', ':')) + ',\n')
+            self._file.flush()
+            if self._file.tell() >= self.max_bytes:
+                self._file.close()
+                os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+                self._open()
+                # Track names are announced again in the new file
+                self._tracks.clear()
+        except OSError as e:
+            logger.warning(f"Disabling tracing, could not write {self.path}: {e}")
+            self._file = None
+            self.enabled = False
+
+_tracer = Tracer()
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        The configured tracer, or a disabled one
+    """
+    return _tracer
+
+def configure_tracer(path: Path) -> Tracer:
+    """
+    Enable process-wide tracing to a file.
+
+    Calling it again with the same path keeps the current tracer.
+
+    Args:
+        path: Trace file
+
+    Returns:
+        The process-wide tracer
+    """
+    global _tracer
+    path = Path(path).resolve()
+    with _tracer_lock:
+        if _tracer.path != path:
+            _tracer.close()
+            _tracer = Tracer(path)
+        return _tracer
+
+# Profiles collected for the cycle running in the current context
+_cycle_profiles: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar(
+    'cycle_profiles', default=None
+)
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a blocking callable so it is profiled on the thread it runs on
+    when the calling sync cycle is being profiled.
+
+    Call it from the cycle's task, before handing the callable to a thread.
+
+    Args:
+        func: Callable about to run on a worker thread
+
+    Returns:
+        The callable itself, or a profiling wrapper
+    """
+    profiles = _cycle_profiles.get()
+    if profiles is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler, e.g. a debugger, is active
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiles.append(profiler)
+    return run
+
+class CycleProfiler:
+    """Profile sampled and post-slow sync cycles, keeping slow ones."""
+
+    # cProfile and tracemalloc are process-wide; one cycle at a time
+    _active = threading.Lock()
+
+    def __init__(self,
+                 output_dir: Path,
+                 threshold: float,
+                 sample_rate: float = 0.0,
+                 arm_cycles: int = 3,
+                 top_allocations: int = 25):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory receiving profiles of slow cycles
+            threshold: Cycle duration in seconds considered slow
+            sample_rate: Fraction of cycles profiled regardless
+            arm_cycles: Cycles profiled after an unprofiled slow cycle
+            top_allocations: Allocation sites listed per tracemalloc report
+        """
+        self.output_dir = output_dir
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.arm_cycles = arm_cycles
+        self.top_allocations = top_allocations
+        self._armed = 0
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """
+        Time a cycle, profiling it if sampled or armed.
+
+        Args:
+            name: Label for saved profiles, e.g. the repository
+        """
+        profiled = ((self._armed > 0 or random.random() < self.sample_rate)
+                    and self._active.acquire(blocking=False))
+        profiles: List[cProfile.Profile] = []
+        token = None
+        started_tracemalloc = False
+        if profiled:
+            self._armed = max(0, self._armed - 1)
+            token = _cycle_profiles.set(profiles)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if profiled:
+                try:
+                    _cycle_profiles.reset(token)
+                    snapshot = tracemalloc.take_snapshot()
+                    if started_tracemalloc:
+                        tracemalloc.stop()
+                    if duration >= self.threshold:
+                        self._save(name, duration, profiles, snapshot)
+                finally:
+                    self._active.release()
+            elif duration >= self.threshold and self.arm_cycles:
+                logger.info(
+                    f"Cycle for {name} took {duration:.1f}s, "
+                    f"profiling the next {self.arm_cycles}"
+                )
+                self._armed = self.arm_cycles
+
+    def _save(self,
+              name: str,
+              duration: float,
+              profiles: List[cProfile.Profile],
+              snapshot: tracemalloc.Snapshot) -> None:
+        """
+        Write the profile and allocation report of a slow cycle.
+
+        Args:
+            name: Cycle label
+            duration: Cycle duration in seconds
+            profiles: Stopped profilers of the cycle's git executor calls
+            snapshot: Allocations at the end of the cycle
+        """
+        now = time.time()
+        stem = (time.strftime('%Y%m%dT%H%M%S', time.localtime(now)) +
+                f".{int(now * 1000) % 1000:03d}-" + re.sub(r'[^\w.-]', '_', name))
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            if profiles:
+                stats = pstats.Stats(profiles[0])
+                for profiler in profiles[1:]:
+                    stats.add(profiler)
+                stats.dump_stats(str(self.output_dir / f'{stem}.prof'))
+            lines = [f"Cycle for {name} took {duration:.3f}s; top allocations:"]
+            lines.extend(str(stat) for stat in
+                         snapshot.statistics('lineno')[:self.top_allocations])
+            (self.output_dir / f'{stem}.tracemalloc.txt').write_text('\n'.join(lines) + '\n')
+        except OSError as e:
+            logger.warning(f"Could not save cycle profile: {e}")
+            return
+        logger.info(f"Saved profile of {duration:.1f}s cycle to {self.output_dir / stem}.*")
+        get_tracer().instant('slow_cycle_profile', 'profile', repository=name,
+                             duration=duration, profile=stem)
@@ -41,9 +41,14 @@ install_hooks() {
     chmod 600 "$SYNC_DIR/sync.log"
     chmod 600 "$SYNC_DIR/security_checks.log"
     
-    # Initialize metrics file
-    echo '{"syncs":[],"last_update":""}' > "$SYNC_DIR/metrics.json"
-    chmod 600 "$SYNC_DIR/metrics.json"
+    # Initialize metrics file; hooks append one JSON line per push
+    touch "$SYNC_DIR/metrics.jsonl"
+    chmod 600 "$SYNC_DIR/metrics.jsonl"
+
+    # Precompile documentation templates so the first render skips compilation
+    if ! (cd "$REPO_ROOT" && python3 -m git_sync.core.template_registry "$SYNC_DIR/templates"); then
+        log "${YELLOW}[WARNING] Template precompilation failed; templates will compile on first use${NC}"
+    fi
 }
 
 # Verify hooks
@@ -75,7 +80,7 @@ verify_hooks() {
     fi
     
     # Check file permissions
-    for file in "$SYNC_DIR"/*.log "$SYNC_DIR/metrics.json"; do
+    for file in "$SYNC_DIR"/*.log "$SYNC_DIR/metrics.jsonl"; do
         if [ "$(stat -c %a "$file")" != "600" ]; then
             log "${RED}[ERROR] Incorrect permissions on $file${NC}"
             status=1
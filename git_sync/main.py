@@ -11,14 +11,144 @@ import asyncio
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from config.sync_config import ConfigurationManager, Environment, SyncConfig
 from core.sync_engine import GitHubSyncEngine
 from core.documentation_manager import DocumentationManager
+from core.event_bridge import EventBridge
+from core.git_executor import GitExecutor
+from core.metrics_exporter import MetricsExporter
+from core.supervisor import SyncSupervisor
+from core.template_registry import get_registry
 
 logger = logging.getLogger(__name__)
 
+class RepositorySync:
+    """Drive sync cycles and documentation updates for one repository."""
+
+    def __init__(self,
+                 config: SyncConfig,
+                 git_executor: Optional[GitExecutor] = None):
+        """
+        Initialize the repository worker.
+
+        Args:
+            config: Sync configuration for the repository
+            git_executor: Executor for blocking git calls, shared between
+                repositories
+        """
+        self.config = config
+        self.name = config.repository
+        self.sync_engine = GitHubSyncEngine(config, git_executor)
+        self.doc_manager = DocumentationManager(
+            config.repository_path,
+            config.repository_path / 'templates',
+            self.sync_engine.state_store,
+            config.repository
+        )
+        self.doc_pipeline = self.doc_manager.create_pipeline("dev")
+        self.event_bridge: Optional[EventBridge] = None
+        self._first_cycle = True
+
+    async def initialize(self) -> None:
+        """Initialize the sync engine and hook up change notifications."""
+        await self.sync_engine.initialize()
+        if self.config.sync_mode == "event":
+            self.event_bridge = EventBridge(asyncio.get_running_loop())
+            self.sync_engine.file_watcher.add_listener(
+                self.event_bridge.publish
+            )
+
+    async def wait_for_trigger(self) -> None:
+        """
+        Wait until the next sync cycle is due.
+
+        The first cycle runs immediately. After that, ``interval`` mode
+        sleeps ``sync_interval`` seconds, and ``event`` mode waits for local
+        changes to settle with ``sync_interval`` as a fallback.
+        """
+        if self._first_cycle:
+            self._first_cycle = False
+            return
+
+        if self.event_bridge is None:
+            await asyncio.sleep(self.config.sync_interval)
+        elif await self._wait_for_changes(self.event_bridge):
+            logger.debug(f"{self.name}: local changes settled, starting sync")
+        else:
+            logger.debug(f"{self.name}: no local changes, running fallback sync")
+
+    async def run_cycle(self) -> bool:
+        """
+        Run one sync cycle followed by documentation updates.
+
+        Returns:
+            True if the sync succeeded
+        """
+        success = await self.sync_engine.sync()
+        if success:
+            await self._update_documentation()
+        return success
+
+    async def _wait_for_changes(self, bridge: EventBridge) -> bool:
+        """
+        Wait until pending changes settle or the fallback interval elapses.
+
+        After the first change, waits until ``quiet_period`` seconds pass
+        without another change, but never longer than ``max_latency``
+        seconds in total.
+
+        Args:
+            bridge: Bridge delivering watcher event batches
+
+        Returns:
+            True if file changes triggered the wake-up, False on fallback
+        """
+        config = self.config
+        try:
+            batch = await asyncio.wait_for(bridge.get(),
+                                           timeout=config.sync_interval)
+        except asyncio.TimeoutError:
+            return False
+        batches = [batch]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config.max_latency
+        while True:
+            timeout = min(config.quiet_period, deadline - loop.time())
+            if timeout <= 0:
+                break
+            try:
+                batches.append(
+                    await asyncio.wait_for(bridge.get(), timeout=timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        # Batches already queued are covered by the upcoming sync
+        batches.extend(bridge.drain())
+        if any(batch.rescan for batch in batches):
+            self.sync_engine.file_watcher.request_full_scan()
+        return True
+
+    async def _update_documentation(self) -> None:
+        """Update project documentation based on recent changes."""
+        try:
+            # Reuse this cycle's analysis instead of diffing the tree again
+            changes = [
+                change for change in self.sync_engine.last_changes
+                if not self.doc_manager.is_generated(change[0])
+            ]
+            if changes:
+                timings = await self.doc_pipeline.run(changes)
+                self.sync_engine.metrics.record_many([
+                    (self.name, f"doc_{stage}_duration_seconds", duration)
+                    for stage, duration in timings.items()
+                ])
+        except Exception as e:
+            logger.error(f"Failed to update documentation: {e}")
+
 class SyncManager:
     """Orchestrate the GitHub synchronization system."""
 
@@ -30,53 +160,61 @@ class SyncManager:
             config_path: Optional path to configuration file
         """
         self.config_manager = ConfigurationManager(config_path)
-        self.sync_engine: Optional[GitHubSyncEngine] = None
-        self.doc_manager: Optional[DocumentationManager] = None
+        self.workers: List[RepositorySync] = []
+        self.supervisor: Optional[SyncSupervisor] = None
+        self.exporter: Optional[MetricsExporter] = None
         self._setup_logging()
 
     async def start(self, env: Environment = Environment.DEVELOPMENT) -> None:
         """
         Start the synchronization system.
 
+        Every repository configured for the environment is synced from this
+        process, with at most ``concurrent_operations`` cycles at a time.
+
         Args:
             env: Environment to run in
         """
         try:
             # Load configuration
-            config = self.config_manager.load_config(env)
-            
+            configs = self.config_manager.load_all_configs(env)
+            settings = configs[0]
+
             # Initialize components
-            self.sync_engine = GitHubSyncEngine(config)
-            self.doc_manager = DocumentationManager(
-                config.repository_path,
-                config.repository_path / 'templates'
+            git_executor = GitExecutor(
+                max_workers=settings.concurrent_operations,
+                default_timeout=settings.operation_timeout
+            )
+            self.workers = [
+                RepositorySync(config, git_executor) for config in configs
+            ]
+            if settings.metrics_port:
+                self.exporter = MetricsExporter(
+                    [worker.sync_engine.metrics for worker in self.workers],
+                    port=settings.metrics_port,
+                    before_scrape=self._ingest_hook_metrics
+                )
+                await self.exporter.start()
+
+            self.supervisor = SyncSupervisor(
+                self.workers,
+                max_concurrency=settings.concurrent_operations,
+                cycle_timeout=settings.cycle_timeout
             )
-            
-            # Initialize sync engine
-            await self.sync_engine.initialize()
-            
-            # Start periodic sync
-            while True:
-                success = await self.sync_engine.sync()
-                if success:
-                    await self._update_documentation()
-                await asyncio.sleep(config.sync_interval)
+
+            await self.supervisor.run()
 
         except Exception as e:
             logger.error(f"Failed to start sync system: {e}")
             raise
 
-    async def _update_documentation(self) -> None:
-        """Update project documentation based on recent changes."""
-        try:
-            changes = await self.sync_engine._analyze_local_changes()
-            if changes:
-                await self.doc_manager.update_readme(changes)
-                await self.doc_manager.update_changelog("dev", changes)
-                self.doc_manager.generate_contributor_docs()
-                await self.doc_manager.generate_api_docs()
-        except Exception as e:
-            logger.error(f"Failed to update documentation: {e}")
+    def _ingest_hook_metrics(self) -> None:
+        """Import push metrics appended by the post-commit hooks."""
+        for worker in self.workers:
+            worker.sync_engine.metrics.ingest_jsonl(
+                worker.config.repository_path / 'git_sync' / 'metrics.jsonl',
+                worker.name
+            )
 
     def _setup_logging(self) -> None:
         """Configure logging for the sync manager."""
@@ -106,12 +244,21 @@ def parse_args() -> argparse.Namespace:
         default=Environment.DEVELOPMENT.value,
         help="Environment to run in"
     )
+    parser.add_argument(
+        "--precompile-templates",
+        action="store_true",
+        help="Compile the documentation templates into the bytecode cache and exit"
+    )
     return parser.parse_args()
 
 async def main() -> None:
     """Main entry point."""
     args = parse_args()
-    
+
+    if args.precompile_templates:
+        get_registry(Path(__file__).parent / 'templates').precompile()
+        return
+
     try:
         manager = SyncManager(args.config)
         await manager.start(Environment(args.env))
@@ -14,7 +14,7 @@ NC='\033[0m'
 # Configuration
 REPO_ROOT=$(git rev-parse --show-toplevel)
 LOG_FILE="$REPO_ROOT/git_sync/sync.log"
-METRICS_FILE="$REPO_ROOT/git_sync/metrics.json"
+METRICS_FILE="$REPO_ROOT/git_sync/metrics.jsonl"
 LOCK_FILE="$REPO_ROOT/git_sync/.sync.lock"
 MAX_RETRIES=3
 RETRY_DELAY=5
@@ -28,38 +28,26 @@ log() {
 }
 
 # Update sync metrics
+# Appends one JSON line per push; the sync engine's metrics store ingests
+# new lines incrementally, so the cost does not grow with history
 update_metrics() {
     local status="$1"
     local duration="$2"
-    local timestamp=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
+    local timestamp=$(date -u +%s)
     local branch=$(git symbolic-ref --short HEAD)
     local commit=$(git rev-parse HEAD)
-    local commit_msg=$(git log -1 --pretty=%B)
+    local success=0
 
-    # Create metrics file if it doesn't exist
-    if [ ! -f "$METRICS_FILE" ]; then
-        echo '{"syncs":[],"statistics":{"total":0,"successful":0,"failed":0}}' > "$METRICS_FILE"
+    if [ "$status" == "success" ]; then
+        success=1
     fi
 
-    # Update metrics
-    local temp_file=$(mktemp)
-    jq --arg ts "$timestamp" \
-       --arg branch "$branch" \
-       --arg commit "$commit" \
-       --arg msg "$commit_msg" \
-       --arg status "$status" \
-       --arg duration "$duration" \
-       '.syncs += [{
-           "timestamp": $ts,
-           "branch": $branch,
-           "commit": $commit,
-           "message": $msg,
-           "status": $status,
-           "duration": ($duration | tonumber)
-       }] | .statistics.total += 1 | 
-       if $status == "success" then .statistics.successful += 1 
-       else .statistics.failed += 1 end' \
-       "$METRICS_FILE" > "$temp_file" && mv "$temp_file" "$METRICS_FILE"
+    # Branch names may contain quotes or backslashes
+    branch=${branch//\\/\\\\}
+    branch=${branch//\"/\\\"}
+
+    printf '{"ts":%s,"branch":"%s","commit":"%s","status":"%s","hook_push_duration_seconds":%s,"hook_push_success":%s}\n' \
+        "$timestamp" "$branch" "$commit" "$status" "$duration" "$success" >> "$METRICS_FILE"
 }
 
 # Clean up function
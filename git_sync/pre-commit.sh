@@ -16,33 +16,7 @@ REPO_ROOT=$(git rev-parse --show-toplevel)
 LOG_FILE="$REPO_ROOT/git_sync/security_checks.log"
 MAX_FILE_SIZE=10485760  # 10MB in bytes
 
-# MachinaForge-specific sensitive patterns
-SENSITIVE_PATTERNS=(
-    # Hetzner credentials
-    'HCLOUD_TOKEN\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'ROOT_PASSWORD\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    
-    # MCP API and security
-    'MCP_API_KEY\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'MCP_DB_PASSWORD\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'SECRET_KEY\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    
-    # Database credentials
-    'DB_PASSWORD\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'MYSQL_PASSWORD\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'MONGODB_URI\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    
-    # API tokens and keys
-    'API[_\-]?TOKEN\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'API[_\-]?KEY\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    'PRIVATE[_\-]?KEY\s*=\s*["'"'"'][^"'"'"']*["'"'"']'
-    
-    # Common patterns
-    '[0-9a-fA-F]{32}'  # 32-char hex (like API keys)
-    '[0-9a-zA-Z]{40}'  # 40-char alphanumeric (like tokens)
-    '[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}'  # IP addresses
-    '[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,63}'  # Email addresses
-)
+# Sensitive data patterns live in git_sync/core/secret_scanner.py
 
 # Sensitive and restricted files
 SENSITIVE_FILES=(
@@ -87,26 +61,21 @@ log() {
     echo -e "$1"
 }
 
-# Check file for sensitive data
+# Scan all staged changes for sensitive data in one pass
 check_sensitive_data() {
-    local file="$1"
+    local findings
     local status=0
 
-    # Skip binary files
-    if [ -z "$(file "$file" | grep text)" ]; then
-        return 0
-    }
-
-    # Get only added/modified lines
-    local diff_content
-    diff_content=$(git diff --cached "$file" | grep -E '^\+' | grep -Ev '^\+\+\+')
+    # One staged diff stream, all patterns combined, results cached by blob
+    findings=$(cd "$REPO_ROOT" && python3 -m git_sync.core.secret_scanner) || status=$?
 
-    for pattern in "${SENSITIVE_PATTERNS[@]}"; do
-        if echo "$diff_content" | grep -E "$pattern" > /dev/null; then
-            log "${RED}[ERROR] Potential sensitive data in $file matches pattern: $pattern${NC}"
-            status=1
-        fi
-    done
+    if [ $status -eq 1 ]; then
+        while IFS= read -r finding; do
+            log "${RED}[ERROR] Potential sensitive data in $finding${NC}"
+        done <<< "$findings"
+    elif [ $status -ne 0 ]; then
+        log "${RED}[ERROR] Sensitive data scan failed with status $status${NC}"
+    fi
 
     return $status
 }
@@ -190,6 +159,10 @@ main() {
     local exit_status=0
     log "${GREEN}Running pre-commit security checks...${NC}"
 
+    if ! check_sensitive_data; then
+        exit_status=1
+    fi
+
     # Get staged files
     staged_files=$(git diff --cached --name-only)
 
@@ -202,10 +175,6 @@ main() {
         log "${GREEN}Checking: $file${NC}"
 
         # Run all checks
-        if ! check_sensitive_data "$file"; then
-            exit_status=1
-        fi
-
         if ! check_file_permissions "$file"; then
             exit_status=1
         fi